@@ -0,0 +1,34 @@
+"""auth events
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 14:21:07.318465
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '005'
+down_revision: Union[str, Sequence[str], None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('auth_events',
+    sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=True),
+    sa.Column('reason', sa.String(), nullable=True),
+    sa.Column('ip', sa.String(), nullable=True),
+    postgresql_partition_by='RANGE (occurred_at)'
+    )
+    # Daily partitions are created by src/auth/partitions.py
+    op.execute('CREATE TABLE auth_events_default PARTITION OF auth_events DEFAULT')
+
+
+def downgrade() -> None:
+    op.drop_table('auth_events')
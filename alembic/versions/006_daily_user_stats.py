@@ -0,0 +1,31 @@
+"""daily user stats
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 19:08:35.627049
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '006'
+down_revision: Union[str, Sequence[str], None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('daily_user_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('signups', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('active_users', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    # Fill from existing data with `python -m src.stats.rollups`
+
+
+def downgrade() -> None:
+    op.drop_table('daily_user_stats')
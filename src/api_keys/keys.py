@@ -0,0 +1,77 @@
+import hashlib
+import secrets
+import time
+from collections import OrderedDict
+from uuid import UUID
+
+from src.api_keys.repo import ApiKeyRepo
+from src.api_keys.schemas import ApiKeyOut
+from src.core import hashing
+from src.core.config import settings
+
+# Keys look like "<prefix>.<secret>". The prefix is stored in clear and
+# indexed, so verification is one lookup plus one Argon2 check.
+SEPARATOR = "."
+
+
+def generate_key() -> tuple[str, str]:
+    prefix = secrets.token_hex(6)
+    return prefix, f"{prefix}{SEPARATOR}{secrets.token_urlsafe(32)}"
+
+
+class VerificationCache:
+    """Recently verified keys, so hot callers skip Argon2 for `ttl` seconds."""
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Insertion order is expiry order, since every entry lives `ttl`
+        self.entries: OrderedDict[str, tuple[float, ApiKeyOut]] = OrderedDict()
+
+    @staticmethod
+    def digest(key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key: str) -> ApiKeyOut | None:
+        entry = self.entries.get(self.digest(key))
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, key: str, api_key: ApiKeyOut) -> None:
+        now = time.monotonic()
+        digest = self.digest(key)
+        self.entries.pop(digest, None)
+        while self.entries and next(iter(self.entries.values()))[0] < now:
+            self.entries.popitem(last=False)
+        if len(self.entries) >= self.max_entries:
+            self.entries.popitem(last=False)
+        self.entries[digest] = (now + self.ttl, api_key)
+
+    def discard(self, id: UUID) -> None:
+        for digest in [d for d, e in self.entries.items() if e[1].id == id]:
+            del self.entries[digest]
+
+
+verification_cache = VerificationCache(
+    settings.api_key_cache_seconds,
+    settings.api_key_cache_max_entries,
+)
+
+
+async def authenticate(repo: ApiKeyRepo, key: str) -> ApiKeyOut | None:
+    cached = verification_cache.get(key)
+    if cached is not None:
+        return cached
+
+    prefix, separator, _ = key.partition(SEPARATOR)
+    if not separator:
+        return None
+
+    api_key = await repo.get_active_by_prefix(prefix)
+    if api_key is None or not await hashing.verify_secret(api_key.key_hash, key):
+        return None
+
+    api_key_out = ApiKeyOut.model_validate(api_key)
+    verification_cache.put(key, api_key_out)
+    return api_key_out
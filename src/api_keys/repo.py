@@ -0,0 +1,46 @@
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import Depends
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api_keys.models import ApiKey
+from src.core.db import SessionDep
+
+
+class ApiKeyRepo:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_active_by_prefix(self, prefix: str) -> ApiKey | None:
+        stmt = select(ApiKey).where(ApiKey.prefix == prefix, ApiKey.is_active)
+
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def create(self, name: str, prefix: str, key_hash: str) -> ApiKey:
+        api_key = ApiKey(name=name, prefix=prefix, key_hash=key_hash)
+        self.session.add(api_key)
+        await self.session.commit()
+        await self.session.refresh(api_key)
+        return api_key
+
+    async def deactivate(self, id: UUID) -> bool:
+        stmt = (
+            update(ApiKey)
+            .where(ApiKey.id == id, ApiKey.is_active)
+            .values(is_active=False)
+            .returning(ApiKey.id)
+        )
+
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return result.scalar_one_or_none() is not None
+
+
+def get_api_key_repo(session: SessionDep) -> ApiKeyRepo:
+    return ApiKeyRepo(session)
+
+
+ApiKeyRepoDep = Annotated[ApiKeyRepo, Depends(get_api_key_repo)]
@@ -0,0 +1,51 @@
+from typing import Any
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, status
+
+from src.api_keys import keys, schemas
+from src.api_keys.repo import ApiKeyRepoDep
+from src.core import hashing
+from src.core.deps import CurrentAdminDep, CurrentApiKeyDep
+
+router = APIRouter(prefix="/api-keys", tags=["api-keys"])
+
+
+@router.post(
+    "",
+    status_code=status.HTTP_201_CREATED,
+    response_model=schemas.ApiKeyCreated,
+    summary="Create a service API key (shown once)",
+)
+async def create_api_key(
+    data: schemas.ApiKeyIn, api_key_repo: ApiKeyRepoDep, _: CurrentAdminDep
+) -> Any:
+    prefix, key = keys.generate_key()
+    key_hash = await hashing.hash_secret(key)
+
+    api_key = await api_key_repo.create(data.name, prefix, key_hash)
+    return schemas.ApiKeyCreated(
+        **schemas.ApiKeyOut.model_validate(api_key).model_dump(), key=key
+    )
+
+
+@router.delete(
+    "/{api_key_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Revoke a service API key",
+)
+async def revoke_api_key(
+    api_key_id: UUID, api_key_repo: ApiKeyRepoDep, _: CurrentAdminDep
+) -> None:
+    if not await api_key_repo.deactivate(api_key_id):
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "API key not found")
+    keys.verification_cache.discard(api_key_id)
+
+
+@router.get(
+    "/me",
+    response_model=schemas.ApiKeyOut,
+    summary="Get the calling service API key",
+)
+async def read_current_api_key(api_key: CurrentApiKeyDep) -> Any:
+    return api_key
@@ -0,0 +1,19 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class ApiKeyIn(BaseModel):
+    name: str
+
+
+class ApiKeyOut(BaseModel, from_attributes=True):
+    id: UUID
+    name: str
+    prefix: str
+    created_at: datetime
+
+
+class ApiKeyCreated(ApiKeyOut):
+    key: str
@@ -0,0 +1,112 @@
+import asyncio
+import contextlib
+import logging
+from datetime import UTC, datetime
+from typing import Any
+from uuid import UUID
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.auth.models import AuthEventKind, auth_events
+from src.core.config import settings
+from src.core.db import engine
+from src.core.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("occurred_at", "kind", "user_id", "reason", "ip")
+
+events_written = Counter(
+    "auth_events_written_total", "Auth events copied into auth_events"
+)
+events_dropped = Counter(
+    "auth_events_dropped_total", "Auth events dropped because the queue was full"
+)
+events_failed = Counter(
+    "auth_events_failed_total", "Auth events lost to failed COPY batches"
+)
+
+
+class AuthEventWriter:
+    """Background ingestion of auth events.
+
+    Requests only enqueue a tuple; when the bounded queue is full the event
+    is dropped and counted. The writer drains up to `batch_size` events, or
+    whatever arrived within `flush_interval` of the first one, and ingests
+    them with a single COPY.
+    """
+
+    def __init__(
+        self,
+        db_engine: AsyncEngine,
+        max_queue: int,
+        batch_size: int,
+        flush_interval: float,
+    ) -> None:
+        self.engine = db_engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue[tuple[Any, ...]] = asyncio.Queue(max_queue)
+        self.batch: list[tuple[Any, ...]] = []
+        self.task: asyncio.Task[None] | None = None
+
+    def record(
+        self,
+        kind: AuthEventKind,
+        request: Request | None = None,
+        user_id: UUID | None = None,
+        reason: str | None = None,
+    ) -> None:
+        ip = request.client.host if request and request.client else None
+        try:
+            self.queue.put_nowait((datetime.now(UTC), kind, user_id, reason, ip))
+        except asyncio.QueueFull:
+            events_dropped.inc()
+
+    async def write(self, batch: list[tuple[Any, ...]]) -> None:
+        async with self.engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(  # type: ignore[union-attr]
+                auth_events.name, records=batch, columns=COLUMNS
+            )
+        events_written.inc(len(batch))
+
+    async def collect(self) -> None:
+        self.batch.append(await self.queue.get())
+        with contextlib.suppress(TimeoutError):
+            async with asyncio.timeout(self.flush_interval):
+                while len(self.batch) < self.batch_size:
+                    self.batch.append(await self.queue.get())
+
+    def start(self) -> None:
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.task
+        while not self.queue.empty():
+            self.batch.append(self.queue.get_nowait())
+        if self.batch:
+            await self.write(self.batch)
+            self.batch = []
+
+    async def run(self) -> None:
+        while True:
+            await self.collect()
+            try:
+                await self.write(self.batch)
+            except Exception:
+                events_failed.inc(len(self.batch))
+                logger.exception("Writing %d auth events failed", len(self.batch))
+            self.batch = []
+
+
+auth_event_writer = AuthEventWriter(
+    engine,
+    settings.auth_events_queue_size,
+    settings.auth_events_batch_size,
+    settings.auth_events_flush_seconds,
+)
@@ -1,23 +1,90 @@
+import asyncio
+import hashlib
+import math
 import secrets
+import time
+from typing import Any
 
 import httpx
 from fastapi import status
-from google.auth.exceptions import GoogleAuthError
+from google.auth.exceptions import GoogleAuthError, TransportError
 from google.auth.transport import requests
 from google.oauth2 import id_token as google_id_token
 from starlette.datastructures import URL
 
 from src.auth import schemas
+from src.core.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    CircuitThresholds,
+)
 from src.core.config import settings
+from src.core.metrics import Counter, Gauge
+from src.core.single_flight import SingleFlight
 
 TOKEN_URL = "https://oauth2.googleapis.com/token"
 AUTH_BASE_URL = "https://accounts.google.com/o/oauth2/v2/auth"
 
-google_request = requests.Request()
+
+class TimeoutRequest(requests.Request):
+    """google-auth transport whose calls default to our timeout, not 120 s."""
+
+    def __call__(self, url: str, method: str = "GET", *args: Any, **kwargs: Any) -> Any:
+        kwargs.setdefault("timeout", settings.google_timeout_seconds)
+        return super().__call__(url, method, *args, **kwargs)  # type: ignore[no-untyped-call]
+
+
+google_request = TimeoutRequest()
+
+client = httpx.AsyncClient(timeout=settings.google_timeout_seconds)
 
 
 class OAuthFlowError(Exception):
-    pass
+    """`reason` is one of a fixed set of codes, recorded in the auth events."""
+
+    reason = "exchange_failed"
+
+    def __init__(self, message: str, reason: str | None = None) -> None:
+        super().__init__(message)
+        if reason is not None:
+            self.reason = reason
+
+
+class GoogleUnavailableError(OAuthFlowError):
+    """Google failed to answer properly, or its circuit is open."""
+
+    reason = "google_unavailable"
+
+
+google_breaker = CircuitBreaker(
+    "google",
+    CircuitThresholds(
+        window=settings.google_breaker_window_seconds,
+        min_calls=settings.google_breaker_min_calls,
+        failure_rate=settings.google_breaker_failure_rate,
+        slow_call_seconds=settings.google_breaker_slow_call_seconds,
+        slow_call_rate=settings.google_breaker_slow_call_rate,
+        open_seconds=settings.google_breaker_open_seconds,
+    ),
+    failures=(GoogleUnavailableError,),
+)
+
+CIRCUIT_STATE_VALUES = {
+    CircuitState.closed: 0,
+    CircuitState.half_open: 1,
+    CircuitState.open: 2,
+}
+
+Gauge(
+    "google_circuit_state",
+    "Google circuit breaker state (0 closed, 1 half-open, 2 open)",
+    lambda: CIRCUIT_STATE_VALUES[google_breaker.state],
+)
+google_circuit_rejections = Counter(
+    "google_circuit_rejections_total",
+    "OAuth callbacks failed fast because the Google circuit was open",
+)
 
 
 def build_google_auth_url(state: str) -> URL:
@@ -42,6 +109,8 @@ def verify_id_token(token: str) -> schemas.GoogleUser:
             google_request,
             settings.google_client_id,
         )
+    except TransportError as exc:
+        raise GoogleUnavailableError("Google certificates fetch failed") from exc
     except (GoogleAuthError, ValueError) as exc:
         raise OAuthFlowError("id_token verification failed") from exc
 
@@ -56,8 +125,65 @@ async def fetch_id_token_from_code(code: str) -> str:
         "redirect_uri": settings.google_redirect_uri,
         "grant_type": "authorization_code",
     }
-    async with httpx.AsyncClient() as client:
+    try:
         response = await client.post(url=TOKEN_URL, data=payload)
-        if response.status_code != status.HTTP_200_OK:
-            raise OAuthFlowError("Code to id_token exchange failed")
-        return response.json()["id_token"]
+    except httpx.HTTPError as exc:
+        raise GoogleUnavailableError("Code to id_token exchange failed") from exc
+    if response.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+        raise GoogleUnavailableError("Code to id_token exchange failed")
+    if response.status_code != status.HTTP_200_OK:
+        raise OAuthFlowError("Code to id_token exchange failed")
+    return response.json()["id_token"]
+
+
+async def exchange_code(code: str) -> schemas.GoogleUser:
+    try:
+        with google_breaker.guard():
+            id_token = await fetch_id_token_from_code(code)
+        with google_breaker.guard():
+            # Blocking: certificates are fetched with `requests`
+            return await asyncio.to_thread(verify_id_token, id_token)
+    except CircuitOpenError as exc:
+        google_circuit_rejections.inc()
+        raise GoogleUnavailableError("Google is unavailable") from exc
+
+
+class CodeExchange(SingleFlight):
+    """Single-flight code exchange shared by duplicate callbacks.
+
+    Concurrent callbacks with the same code, state and client IP await one
+    exchange, and its definitive outcome (user or rejected code) is replayed
+    for `ttl` seconds instead of sending an already-used code back to Google.
+    Another client bringing a seen code always goes to Google, which rejects
+    reuse. Outages aren't replayed: Google didn't consume the code.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        super().__init__()
+        self.ttl = ttl
+        self.expires: dict[str, float] = {}
+
+    @staticmethod
+    def key(code: str, state: str, client: str) -> str:
+        return hashlib.sha256(f"{code}\0{state}\0{client}".encode()).hexdigest()
+
+    async def exchange(self, code: str, state: str, client: str) -> schemas.GoogleUser:
+        key = self.key(code, state, client)
+        if key not in self.tasks or self.expires.get(key, math.inf) < time.monotonic():
+            self.purge()
+        return await self.join(key, lambda: exchange_code(code))
+
+    def finished(self, key: str, task: asyncio.Task[Any]) -> None:
+        exc = None if task.cancelled() else task.exception()
+        if task.cancelled() or isinstance(exc, GoogleUnavailableError):
+            super().finished(key, task)
+            return
+        self.expires[key] = time.monotonic() + self.ttl
+
+    def purge(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, expires in self.expires.items() if expires < now]:
+            del self.tasks[key], self.expires[key]
+
+
+code_exchange = CodeExchange(settings.google_code_cache_seconds)
@@ -0,0 +1,37 @@
+from enum import StrEnum
+
+from sqlalchemy import DDL, Column, DateTime, String, Table, event
+from sqlalchemy.dialects.postgresql import UUID
+
+from src.core.db import Base
+
+
+class AuthEventKind(StrEnum):
+    login_succeeded = "login_succeeded"
+    login_failed = "login_failed"
+    logout = "logout"
+    token_rejected = "token_rejected"
+
+
+# Append-only and never loaded as objects, so a plain table without a primary
+# key. Partitioned by day; see src/auth/partitions.py.
+auth_events = Table(
+    "auth_events",
+    Base.metadata,
+    Column("occurred_at", DateTime(timezone=True), nullable=False),
+    Column("kind", String, nullable=False),
+    Column("user_id", UUID(as_uuid=True)),
+    Column("reason", String),
+    Column("ip", String),
+    postgresql_partition_by="RANGE (occurred_at)",
+)
+
+DEFAULT_PARTITION = "auth_events_default"
+
+event.listen(
+    auth_events,
+    "after_create",
+    DDL(  # type: ignore[no-untyped-call]
+        f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF auth_events DEFAULT"
+    ),
+)
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import re
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from src.auth.models import DEFAULT_PARTITION, auth_events
+from src.core.config import settings
+from src.core.db import engine
+
+logger = logging.getLogger(__name__)
+
+# auth_events has one partition per UTC day, created `days_ahead` in advance
+# and dropped after `retention_days`. The DEFAULT partition only catches rows
+# outside every daily range; they are moved out when their day is created.
+# Runs at startup and daily via `python -m src.auth.partitions`.
+
+PARTITION_NAME = re.compile(r"auth_events_(\d{8})")
+LOCK_KEY = "auth_events_partitions"
+
+
+def partition_name(day: date) -> str:
+    return f"auth_events_{day:%Y%m%d}"
+
+
+async def create_partition(conn: AsyncConnection, day: date) -> None:
+    name = partition_name(day)
+    start = datetime(day.year, day.month, day.day, tzinfo=UTC)
+    bounds = {"start": start, "end": start + timedelta(days=1)}
+    in_range = "occurred_at >= :start AND occurred_at < :end"
+
+    await conn.execute(text(f"CREATE TABLE {name} (LIKE {auth_events.name})"))
+    await conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE {in_range} "
+            f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    await conn.execute(
+        text(
+            f"ALTER TABLE {auth_events.name} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{start.isoformat()}') "
+            f"TO ('{bounds['end'].isoformat()}')"
+        )
+    )
+
+
+async def maintain_partitions(
+    db_engine: AsyncEngine, today: date, days_ahead: int, retention_days: int
+) -> tuple[list[str], list[str]]:
+    """Create missing daily partitions and drop expired ones.
+
+    Returns the names of the created and dropped partitions.
+    """
+    async with db_engine.begin() as conn:
+        await conn.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": LOCK_KEY}
+        )
+        result = await conn.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST(:parent AS regclass)"
+            ),
+            {"parent": auth_events.name},
+        )
+        existing = {
+            datetime.strptime(match[1], "%Y%m%d").date()
+            for name in result.scalars()
+            if (match := PARTITION_NAME.fullmatch(name))
+        }
+
+        created = []
+        for offset in range(days_ahead + 1):
+            day = today + timedelta(days=offset)
+            if day not in existing:
+                await create_partition(conn, day)
+                created.append(partition_name(day))
+
+        dropped = []
+        for day in sorted(existing):
+            if day < today - timedelta(days=retention_days):
+                await conn.execute(text(f"DROP TABLE {partition_name(day)}"))
+                dropped.append(partition_name(day))
+
+    if created or dropped:
+        logger.info("auth_events partitions created %s, dropped %s", created, dropped)
+    return created, dropped
+
+
+async def maintain_current_partitions(
+    db_engine: AsyncEngine,
+) -> tuple[list[str], list[str]]:
+    return await maintain_partitions(
+        db_engine,
+        datetime.now(UTC).date(),
+        settings.auth_events_partition_days_ahead,
+        settings.auth_events_retention_days,
+    )
+
+
+async def run_maintenance() -> None:  # pragma: no cover
+    await maintain_current_partitions(engine)
+    await engine.dispose()
+
+
+def main() -> None:  # pragma: no cover
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_maintenance())
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Request, Response, status
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Request, Response, status
 from fastapi.responses import RedirectResponse
 
-from src.auth import google_oauth
+from src.auth import events, google_oauth
 from src.auth.google_oauth import OAuthFlowError
+from src.auth.models import AuthEventKind
+from src.auth.schemas import GoogleUser
 from src.core import security
 from src.core.config import settings
+from src.core.rate_limit import oauth_rate_limit
 from src.users.repo import UserRepoDep
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -23,11 +28,18 @@ def redirect_oauth_failed() -> RedirectResponse:
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Logout (clear auth cookie)",
 )
-async def logout(response: Response) -> None:
+async def logout(request: Request, response: Response) -> None:
+    token = request.cookies.get(security.AUTH_COOKIE_NAME)
+    user_id = security.get_user_id_from_token(token) if token else None
+    events.auth_event_writer.record(AuthEventKind.logout, request, user_id=user_id)
     security.delete_auth_cookie(response)
 
 
-@router.get("/google/login", summary="Redirect to Google auth page")
+@router.get(
+    "/google/login",
+    summary="Redirect to Google auth page",
+    dependencies=[Depends(oauth_rate_limit)],
+)
 async def start_google_oauth() -> RedirectResponse:
     state = google_oauth.generate_token_state()
     url = google_oauth.build_google_auth_url(state=state)
@@ -37,35 +49,63 @@ async def start_google_oauth() -> RedirectResponse:
     return response
 
 
-@router.get("/google/callback", summary="Complete Google OAuth (set JWT cookie)")
-async def finish_google_oauth(
+async def exchange_callback_code(
     request: Request,
-    user_repo: UserRepoDep,
     code: str | None = None,
     state: str | None = None,
     error: str | None = None,
-) -> RedirectResponse:
+) -> GoogleUser:
+    if error is not None:
+        raise OAuthFlowError(error, "google_error")
+    if code is None:
+        raise OAuthFlowError("Code param is missing", "missing_code")
+
+    saved_state = request.cookies.get(security.OAUTH_STATE_COOKIE_NAME)
+    if state is None or saved_state != state:
+        raise OAuthFlowError("Invalid state", "invalid_state")
+
     try:
-        if error is not None:
-            raise OAuthFlowError(error)
-        if code is None:
-            raise OAuthFlowError("Code param is missing")
+        client = request.client.host if request.client else ""
+        return await google_oauth.code_exchange.exchange(code, state, client)
+    except OAuthFlowError:
+        raise
+    except Exception as exc:  # pragma: no cover
+        print("Unexpected OAuth error: ", exc)
+        raise OAuthFlowError("Unexpected error", "unexpected_error") from exc
 
-        saved_state = request.cookies.get(security.OAUTH_STATE_COOKIE_NAME)
-        if state is None or saved_state != state:
-            raise OAuthFlowError("Invalid state")
 
-        id_token = await google_oauth.fetch_id_token_from_code(code)
-        google_user = google_oauth.verify_id_token(id_token)
+# Declared before UserRepoDep, so callbacks waiting on (or failed by) Google
+# never open a DB session
+CallbackGoogleUserDep = Annotated[GoogleUser, Depends(exchange_callback_code)]
 
-        user = await user_repo.update_or_create_google_user(google_user)
-    except OAuthFlowError as exc:
-        print("Google OAuth failed: ", exc)
-        return redirect_oauth_failed()
 
+async def handle_oauth_flow_error(request: Request, exc: Exception) -> Response:
+    print("Google OAuth failed: ", exc)
+    # Not str(exc): the message may echo the unbounded `error` query param
+    reason = exc.reason if isinstance(exc, OAuthFlowError) else "unexpected_error"
+    events.auth_event_writer.record(AuthEventKind.login_failed, request, reason=reason)
+    return redirect_oauth_failed()
+
+
+@router.get(
+    "/google/callback",
+    summary="Complete Google OAuth (set JWT cookie)",
+    dependencies=[Depends(oauth_rate_limit)],
+)
+async def finish_google_oauth(
+    request: Request,
+    google_user: CallbackGoogleUserDep,
+    user_repo: UserRepoDep,
+) -> RedirectResponse:
+    try:
+        user = await user_repo.update_or_create_google_user(google_user)
     except Exception as exc:  # pragma: no cover
         print("Unexpected OAuth error: ", exc)
-        return redirect_oauth_failed()
+        raise OAuthFlowError("Unexpected error", "unexpected_error") from exc
+
+    events.auth_event_writer.record(
+        AuthEventKind.login_succeeded, request, user_id=user.id
+    )
 
     response = RedirectResponse(settings.frontend_url, status.HTTP_303_SEE_OTHER)
     security.delete_oauth_state_cookie(response)
@@ -0,0 +1,256 @@
+import asyncio
+import contextlib
+import hashlib
+import math
+import os
+import re
+import tempfile
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+import httpx
+from fastapi import status
+
+from src.core.config import settings
+from src.core.single_flight import SingleFlight
+
+# Google serves any size of an avatar by rewriting the `=s<px>-c` suffix,
+# so variants are resized upstream and only fetched once per size.
+SIZES = (32, 64, 128, 256, 512)
+ORIGINAL = "orig"
+GOOGLE_HOST_SUFFIX = ".googleusercontent.com"
+GOOGLE_SIZE_SUFFIX = re.compile(r"=[\w-]*$")
+EVICT_TO = 0.9  # evict down to this fraction of max_bytes
+RESCAN_EVERY = 100  # new blobs between rescans of the shared directory size
+TOUCH_INTERVAL = 1.0  # seconds between batched mtime bumps of cache hits
+
+client = httpx.AsyncClient(
+    timeout=settings.avatar_fetch_timeout_seconds,
+    limits=httpx.Limits(
+        max_connections=settings.avatar_max_connections,
+        max_keepalive_connections=settings.avatar_max_connections,
+    ),
+    follow_redirects=True,
+)
+
+
+class AvatarFetchError(Exception):
+    pass
+
+
+class Avatar(NamedTuple):
+    path: Path
+    digest: str
+    media_type: str
+
+
+def version(url: str) -> str:
+    return hashlib.sha256(url.encode()).hexdigest()[:16]
+
+
+def snap_size(size: int | None) -> int | None:
+    if size is None:
+        return None
+    return SIZES[min(bisect_left(SIZES, size), len(SIZES) - 1)]
+
+
+def variant_url(url: str, size: int | None) -> str:
+    if size is None or not (urlsplit(url).hostname or "").endswith(GOOGLE_HOST_SUFFIX):
+        return url
+    return f"{GOOGLE_SIZE_SUFFIX.sub('', url)}=s{size}-c"
+
+
+def ref_name(version: str, size: int | None) -> str:
+    return f"{version}-{size or ORIGINAL}"
+
+
+class AvatarCache:
+    """Content-addressed on-disk cache of avatar images.
+
+    Blobs are named by their sha256, so variants with identical bytes share
+    a file, and small ref files map ``<version>-<size>`` to a blob. Hits bump
+    the blob mtime, in batches off the event loop; once the cache outgrows
+    `max_bytes` the least recently used blobs are deleted. The directory may
+    be shared by all workers: each one rescans its total size every
+    `RESCAN_EVERY` blobs it writes, so together they overshoot `max_bytes`
+    by at most that many blobs each.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, max_image_bytes: int):
+        self.blobs = directory / "blobs"
+        self.refs = directory / "refs"
+        self.max_bytes = max_bytes
+        self.max_image_bytes = max_image_bytes
+        self.index: dict[str, Avatar] = {}
+        self.size: int | None = None
+        self.writes = 0
+        self.downloads = SingleFlight()
+        self.touched: set[Path] = set()
+        self.touched_at = -math.inf
+        self.touching: asyncio.Task[None] | None = None
+
+    async def lookup(self, version: str, size: int | None) -> Avatar | None:
+        ref = ref_name(version, size)
+        avatar = self.index.get(ref)
+        if avatar is not None:
+            self.touch(avatar)
+            return avatar
+        avatar = await asyncio.to_thread(self.read_ref, ref)
+        if avatar is not None:
+            self.index[ref] = avatar
+        return avatar
+
+    async def fetch(self, url: str, size: int | None) -> Avatar:
+        ref = ref_name(version(url), size)
+        avatar = self.index.get(ref)
+        if avatar is not None:
+            self.touch(avatar)
+            return avatar  # downloaded while this caller was looking it up
+        url = variant_url(url, size)
+        return await self.downloads.join(ref, lambda: self.download(ref, url))
+
+    async def download(self, ref: str, url: str) -> Avatar:
+        try:
+            async with client.stream("GET", url) as response:
+                media_type = response.headers.get("content-type", "").partition(";")[0]
+                if response.status_code != status.HTTP_200_OK or not (
+                    media_type.startswith("image/")
+                ):
+                    raise AvatarFetchError(f"Unusable avatar response from {url}")
+                content = bytearray()
+                async for chunk in response.aiter_bytes():
+                    content += chunk
+                    if len(content) > self.max_image_bytes:
+                        raise AvatarFetchError(f"Avatar at {url} is too large")
+        except httpx.HTTPError as exc:
+            raise AvatarFetchError(f"Avatar fetch from {url} failed") from exc
+
+        avatar = await asyncio.to_thread(self.write, ref, bytes(content), media_type)
+        self.index[ref] = avatar
+        if self.size is not None and self.size > self.max_bytes:
+            await self.flush_touches()  # so recent hits aren't evicted
+            self.forget(await asyncio.to_thread(self.evict))
+        return avatar
+
+    def touch(self, avatar: Avatar) -> None:
+        self.touched.add(avatar.path)
+        if (
+            self.touching is None
+            and time.monotonic() - self.touched_at >= TOUCH_INTERVAL
+        ):
+            self.touching = asyncio.create_task(self.flush_touches())
+            self.touching.add_done_callback(self.touches_flushed)
+
+    def touches_flushed(self, task: asyncio.Task[None]) -> None:
+        self.touching = None
+        if not task.cancelled():
+            task.exception()  # mark retrieved; a failed bump only costs LRU order
+
+    async def flush_touches(self) -> None:
+        paths, self.touched = self.touched, set()
+        self.touched_at = time.monotonic()
+        # Blobs another worker evicted since this one indexed them
+        self.forget(await asyncio.to_thread(self.bump, paths))
+
+    async def stat(self, avatar: Avatar) -> os.stat_result | None:
+        """Stat the blob of `avatar`, forgetting it if it was evicted."""
+        try:
+            return await asyncio.to_thread(avatar.path.stat)
+        except FileNotFoundError:
+            self.forget({avatar.path})
+            return None
+
+    def forget(self, paths: set[Path]) -> None:
+        if paths:
+            self.index = {r: a for r, a in self.index.items() if a.path not in paths}
+
+    async def discard(self, url: str) -> None:
+        """Forget every variant of a picture URL the user no longer has."""
+        refs = [ref_name(version(url), size) for size in (None, *SIZES)]
+        for ref in refs:
+            self.index.pop(ref, None)
+        await asyncio.to_thread(self.remove_refs, refs)
+
+    # Blocking filesystem helpers, run in a worker thread
+
+    def bump(self, paths: set[Path]) -> set[Path]:
+        """Bump the mtime of `paths`, returning those that are gone."""
+        missing = set()
+        for path in paths:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                missing.add(path)
+        return missing
+
+    def read_ref(self, ref: str) -> Avatar | None:
+        try:
+            digest, media_type = (self.refs / ref).read_text().split()
+            os.utime(self.blobs / digest)
+        except FileNotFoundError:
+            return None
+        return Avatar(self.blobs / digest, digest, media_type)
+
+    def write(self, ref: str, content: bytes, media_type: str) -> Avatar:
+        if self.size is None:
+            self.blobs.mkdir(parents=True, exist_ok=True)
+            self.refs.mkdir(parents=True, exist_ok=True)
+            self.size = self.scan()
+
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.blobs / digest
+        if not path.exists():
+            self.write_atomic(path, content)
+            self.writes += 1
+            # Other workers write to the same directory
+            if self.writes % RESCAN_EVERY == 0:
+                self.size = self.scan()
+            else:
+                self.size += len(content)
+        self.write_atomic(self.refs / ref, f"{digest} {media_type}".encode())
+        return Avatar(path, digest, media_type)
+
+    def scan(self) -> int:
+        total = 0
+        for path in self.blobs.iterdir():
+            with contextlib.suppress(FileNotFoundError):
+                total += path.stat().st_size
+        return total
+
+    def write_atomic(self, path: Path, content: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=path.parent.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(content)
+        Path(tmp).replace(path)
+
+    def evict(self) -> set[Path]:
+        entries = []
+        for path in self.blobs.iterdir():
+            with contextlib.suppress(FileNotFoundError):
+                entries.append((path.stat(), path))
+        entries.sort(key=lambda entry: entry[0].st_mtime)
+
+        total = sum(stat.st_size for stat, _ in entries)
+        evicted = set()
+        for stat, path in entries:
+            if total <= self.max_bytes * EVICT_TO:
+                break
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+            evicted.add(path)
+        self.size = total
+        return evicted
+
+    def remove_refs(self, refs: list[str]) -> None:
+        for ref in refs:
+            (self.refs / ref).unlink(missing_ok=True)
+
+
+avatar_cache = AvatarCache(
+    settings.avatar_cache_dir,
+    settings.avatar_cache_max_bytes,
+    settings.avatar_max_image_bytes,
+)
@@ -0,0 +1,72 @@
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Header, HTTPException, Query, Response, status
+from fastapi.responses import FileResponse
+
+from src.avatars import cache
+from src.avatars.cache import AvatarFetchError
+from src.users.repo import UserRepo, UserRepoDep
+
+router = APIRouter(prefix="/avatars", tags=["avatars"])
+
+# The version in the path is derived from the picture URL, so a given avatar
+# URL never changes content and can be cached by browsers and CDNs for good.
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+SERVE_ATTEMPTS = 2
+
+avatar_not_found = HTTPException(status.HTTP_404_NOT_FOUND, "Avatar not found")
+
+
+async def find_avatar(
+    user_id: UUID, version: str, size: int | None, user_repo: UserRepo
+) -> cache.Avatar:
+    avatar = await cache.avatar_cache.lookup(version, size)
+    if avatar is not None:
+        return avatar
+    url = await user_repo.get_picture_url(user_id)
+    if url is None or cache.version(url) != version:
+        raise avatar_not_found
+    try:
+        return await cache.avatar_cache.fetch(url, size)
+    except AvatarFetchError as exc:
+        raise HTTPException(status.HTTP_502_BAD_GATEWAY, str(exc)) from exc
+
+
+@router.get(
+    "/{user_id}/{version}",
+    response_class=FileResponse,
+    summary="Get a user's avatar, optionally resized",
+    responses={
+        status.HTTP_304_NOT_MODIFIED: {"description": "Not modified"},
+        status.HTTP_404_NOT_FOUND: {"description": "Avatar not found"},
+        status.HTTP_502_BAD_GATEWAY: {"description": "Avatar fetch failed"},
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"description": "Avatar was evicted"},
+    },
+)
+async def read_avatar(
+    user_id: UUID,
+    version: str,
+    user_repo: UserRepoDep,
+    size: Annotated[int | None, Query(ge=1)] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    size = cache.snap_size(size)
+    # A blob evicted since it was indexed, by another worker or a concurrent
+    # download, is forgotten by `stat` and fetched again
+    for _ in range(SERVE_ATTEMPTS):
+        avatar = await find_avatar(user_id, version, size, user_repo)
+        headers = {"cache-control": CACHE_CONTROL, "etag": f'"{avatar.digest}"'}
+        if if_none_match == headers["etag"]:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        stat_result = await cache.avatar_cache.stat(avatar)
+        if stat_result is not None:
+            # Sent with `http.response.pathsend` (sendfile) on servers supporting it
+            return FileResponse(
+                avatar.path,
+                headers=headers,
+                media_type=avatar.media_type,
+                stat_result=stat_result,
+            )
+    raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, "Avatar was evicted")
@@ -0,0 +1,127 @@
+import contextlib
+import logging
+import time
+from collections import deque
+from collections.abc import Iterator
+from enum import StrEnum
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(StrEnum):
+    closed = "closed"
+    half_open = "half_open"
+    open = "open"
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitThresholds(NamedTuple):
+    window: float
+    min_calls: int
+    failure_rate: float
+    slow_call_seconds: float
+    slow_call_rate: float
+    open_seconds: float
+
+
+class CircuitBreaker:
+    """Failure-rate and slow-call-rate breaker over a sliding time window.
+
+    Closed: outcomes of the last `window` seconds are kept, and once there are
+    at least `min_calls` of them and the share of `failures` exceptions or of
+    calls slower than `slow_call_seconds` reaches its rate, the circuit
+    opens. Open: calls fail fast with CircuitOpenError for `open_seconds`.
+    Half-open: a single probe call goes through; its success closes the
+    circuit, a failure or slow response opens it again.
+
+    Not thread-safe: guard calls from the event loop, not from inside threads.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        thresholds: CircuitThresholds,
+        failures: tuple[type[BaseException], ...],
+    ) -> None:
+        self.name = name
+        self.thresholds = thresholds
+        self.failures = failures
+        self.outcomes: deque[tuple[float, bool, bool]] = deque()
+        self.failed = 0
+        self.slow = 0
+        self.opened_at: float | None = None
+        self.probing = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self.opened_at is None:
+            return CircuitState.closed
+        if time.monotonic() - self.opened_at < self.thresholds.open_seconds:
+            return CircuitState.open
+        return CircuitState.half_open
+
+    @contextlib.contextmanager
+    def guard(self) -> Iterator[None]:
+        state = self.state
+        if state == CircuitState.open or (
+            state == CircuitState.half_open and self.probing
+        ):
+            raise CircuitOpenError(f"Circuit {self.name} is open")
+
+        probe = state == CircuitState.half_open
+        self.probing = self.probing or probe
+        start = time.monotonic()
+        failed = False
+        try:
+            yield
+        except self.failures:
+            failed = True
+            raise
+        finally:
+            self.record(start, failed, probe)
+
+    def record(self, start: float, failed: bool, probe: bool) -> None:
+        window, min_calls, failure_rate, slow_call_seconds, slow_call_rate, _ = (
+            self.thresholds
+        )
+        now = time.monotonic()
+        slow = now - start >= slow_call_seconds
+        if probe:
+            self.probing = False
+            if failed or slow:
+                self.trip(now)
+            else:
+                self.reset()
+            return
+        if self.opened_at is not None:
+            return  # started before the circuit opened
+
+        self.outcomes.append((now, failed, slow))
+        self.failed += failed
+        self.slow += slow
+        while self.outcomes[0][0] < now - window:
+            _, old_failed, old_slow = self.outcomes.popleft()
+            self.failed -= old_failed
+            self.slow -= old_slow
+
+        calls = len(self.outcomes)
+        if calls >= min_calls and (
+            self.failed / calls >= failure_rate or self.slow / calls >= slow_call_rate
+        ):
+            self.trip(now)
+
+    def trip(self, now: float) -> None:
+        logger.warning(
+            "Circuit %s opened for %.0f s", self.name, self.thresholds.open_seconds
+        )
+        self.opened_at = now
+        self.outcomes.clear()
+        self.failed = self.slow = 0
+
+    def reset(self) -> None:
+        logger.info("Circuit %s closed", self.name)
+        self.opened_at = None
@@ -1,4 +1,5 @@
 from enum import StrEnum
+from pathlib import Path
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -8,6 +9,11 @@ class EnvEnum(StrEnum):
     production = "production"
 
 
+class RateLimitBackendEnum(StrEnum):
+    memory = "memory"
+    postgres = "postgres"
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -15,23 +21,104 @@ class Settings(BaseSettings):
 
     environment: EnvEnum = EnvEnum.development
 
+    host: str = "0.0.0.0"
+    port: int = 8000
+    server_workers: int | None = None  # None = one per available CPU
+    server_reload: bool = False
+    server_keep_alive_timeout: int = 5
+    server_backlog: int = 2048
+    server_limit_concurrency: int | None = None
+    server_limit_max_requests: int | None = None
+    server_proxy_headers: bool = True
+    # None = uvicorn's default: $FORWARDED_ALLOW_IPS, else 127.0.0.1
+    server_forwarded_allow_ips: str | None = None
+    # Readiness fails this long before the listener closes on SIGTERM
+    server_drain_delay_seconds: float = 5
+    server_graceful_shutdown_seconds: int = 20
+
+    loop_lag_interval_seconds: float = 0.5
+    loop_block_detector: bool = False
+    loop_block_threshold_ms: float = 100
+
+    profiling_enabled: bool = False
+    profiling_token: str | None = None
+    profiling_interval_ms: float = 1
+    profiling_keep: int = 20
+    profiling_continuous: bool = False
+    profiling_continuous_interval_ms: float = 20
+
     echo_sql: bool = False
+    slow_query_ms: float = 200
+    slow_query_explain_rate: float = 0.1
+    n_plus_one_threshold: int = 5
+
     secret_key: str = "local"
     cookie_expire_minutes: int = 60 * 24 * 365
     cokie_domain: str | None = None
     cors_origins: list[str] = ["*"]
+    cors_max_age: int = 7200  # Chromium caps preflight caching at 2 hours
     frontend_url: str = "http://localhost:5173"
     frontend_oauth_error_url: str = "http://localhost:5173/oauth-error"
 
+    api_key_hash_workers: int = 2
+    api_key_cache_seconds: float = 60
+    api_key_cache_max_entries: int = 10_000
+
+    rate_limit_enabled: bool = True
+    rate_limit_backend: RateLimitBackendEnum = RateLimitBackendEnum.memory
+    rate_limit_max_keys: int = 100_000
+    rate_limit_oauth_requests: int = 30
+    rate_limit_oauth_period_seconds: int = 60
+
     google_client_id: str = "test-client-id"
     google_client_secret: str = "test-client-secret"
     google_redirect_uri: str = "http://localhost:5173/api/v1/auth/google/callback"
+    google_code_cache_seconds: float = 10
+    google_timeout_seconds: float = 5
+    google_breaker_window_seconds: float = 30
+    google_breaker_min_calls: int = 10
+    google_breaker_failure_rate: float = 0.5
+    google_breaker_slow_call_seconds: float = 2
+    google_breaker_slow_call_rate: float = 0.5
+    google_breaker_open_seconds: float = 30
+
+    last_seen_interval_seconds: float = 300
+    last_seen_flush_seconds: float = 10
+    last_seen_max_pending: int = 10_000
+
+    auth_events_queue_size: int = 10_000
+    auth_events_batch_size: int = 1000
+    auth_events_flush_seconds: float = 0.5
+    auth_events_partition_days_ahead: int = 7
+    auth_events_retention_days: int = 90
+
+    stats_cache_seconds: float = 60
+
+    jobs_concurrency: int = 4
+    jobs_poll_seconds: float = 5
+    jobs_max_attempts: int = 5
+    jobs_retry_base_seconds: float = 10
+    jobs_retry_max_seconds: float = 3600
+    # Renewed while a job runs; a worker silent for longer is assumed dead
+    jobs_lease_seconds: float = 300
+    jobs_shutdown_seconds: float = 30
+
+    avatar_cache_dir: Path = Path("/tmp/avatars")
+    avatar_cache_max_bytes: int = 256 * 1024 * 1024
+    avatar_max_image_bytes: int = 2 * 1024 * 1024
+    avatar_fetch_timeout_seconds: float = 5
+    avatar_max_connections: int = 20
 
     postgres_user: str = "local"
     postgres_password: str = "local"
     postgres_host: str = "localhost"
     postgres_port: int = 5432
     postgres_db: str = "local"
+    postgres_pool_size: int = 5
+    postgres_max_overflow: int = 10
+    # PgBouncer in transaction mode (or similar) in front of Postgres.
+    # POSTGRES_POOL_SIZE=0 then disables local pooling entirely.
+    postgres_external_pooler: bool = False
 
     @property
     def database_url(self) -> str:
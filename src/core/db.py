@@ -1,9 +1,11 @@
+import uuid
 from collections.abc import AsyncGenerator
-from typing import Annotated
+from typing import Annotated, Any
 
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import NullPool
 
 from src.core.config import settings
 
@@ -12,10 +14,34 @@ class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.echo_sql,
-)
+def prepared_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def engine_options() -> dict[str, Any]:
+    options: dict[str, Any] = {"echo": settings.echo_sql}
+    if not settings.postgres_external_pooler:
+        options["pool_size"] = settings.postgres_pool_size
+        options["max_overflow"] = settings.postgres_max_overflow
+        return options
+
+    # A transaction-mode pooler (PgBouncer) may run each transaction on a
+    # different server connection, so nothing may outlive a transaction:
+    # no statement caches and no reusable prepared statement names.
+    options["connect_args"] = {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": prepared_statement_name,
+    }
+    if settings.postgres_pool_size == 0:
+        options["poolclass"] = NullPool
+    else:
+        options["pool_size"] = settings.postgres_pool_size
+        options["max_overflow"] = 0
+    return options
+
+
+engine = create_async_engine(settings.database_url, **engine_options())
 
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
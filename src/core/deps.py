@@ -1,9 +1,16 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import Depends, HTTPException, Request, status
+from fastapi import Depends, HTTPException, Request, Security, status
+from fastapi.security import APIKeyHeader
 
+from src.api_keys import keys
+from src.api_keys.repo import ApiKeyRepoDep
+from src.api_keys.schemas import ApiKeyOut
+from src.auth import events
+from src.auth.models import AuthEventKind
 from src.core import security
+from src.users.activity import activity_tracker
 from src.users.models import User
 from src.users.repo import UserRepoDep
 
@@ -12,6 +19,13 @@ auth_failed_exception = HTTPException(
     detail="Authentication failed",
 )
 
+forbidden_exception = HTTPException(
+    status_code=status.HTTP_403_FORBIDDEN,
+    detail="Not enough permissions",
+)
+
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+
 
 async def get_current_user_id(request: Request) -> UUID:
     token = request.cookies.get(security.AUTH_COOKIE_NAME)
@@ -20,6 +34,9 @@ async def get_current_user_id(request: Request) -> UUID:
 
     user_id = security.get_user_id_from_token(token)
     if user_id is None:
+        events.auth_event_writer.record(
+            AuthEventKind.token_rejected, request, reason="Invalid or expired token"
+        )
         raise auth_failed_exception
 
     return user_id
@@ -30,7 +47,34 @@ CurrentUserIdDep = Annotated[UUID, Depends(get_current_user_id)]
 
 async def get_current_user(user_repo: UserRepoDep, user_id: CurrentUserIdDep) -> User:
     user = await user_repo.get_by_id(id=user_id)
+    activity_tracker.seen(user.id)
     return user
 
 
 CurrentUserDep = Annotated[User, Depends(get_current_user)]
+
+
+async def get_current_admin(user: CurrentUserDep) -> User:
+    if not user.is_admin:
+        raise forbidden_exception
+    return user
+
+
+CurrentAdminDep = Annotated[User, Depends(get_current_admin)]
+
+
+async def get_current_api_key(
+    api_key_repo: ApiKeyRepoDep,
+    key: Annotated[str | None, Security(api_key_header)],
+) -> ApiKeyOut:
+    if not key:
+        raise auth_failed_exception
+
+    api_key = await keys.authenticate(api_key_repo, key)
+    if api_key is None:
+        raise auth_failed_exception
+
+    return api_key
+
+
+CurrentApiKeyDep = Annotated[ApiKeyOut, Depends(get_current_api_key)]
@@ -0,0 +1,33 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+
+from src.core.config import settings
+
+hasher = PasswordHasher()
+
+# Argon2 is CPU-bound for tens of milliseconds and releases the GIL, so it
+# runs on a small dedicated pool instead of the event loop.
+executor = ThreadPoolExecutor(
+    max_workers=settings.api_key_hash_workers,
+    thread_name_prefix="argon2",
+)
+
+
+async def hash_secret(secret: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, hasher.hash, secret)
+
+
+def _verify(secret_hash: str, secret: str) -> bool:
+    try:
+        return hasher.verify(secret_hash, secret)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+async def verify_secret(secret_hash: str, secret: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _verify, secret_hash, secret)
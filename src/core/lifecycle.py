@@ -0,0 +1,62 @@
+import logging
+import time
+from collections.abc import Awaitable, Callable, Sequence
+
+logger = logging.getLogger(__name__)
+
+Step = tuple[str, Callable[[], Awaitable[None]]]
+
+
+class Lifecycle:
+    """Shutdown progress of this worker.
+
+    `drain()` fails readiness so the load balancer stops sending new
+    requests; the server closes its listener `drain_delay` seconds later
+    (`close()`) and waits for the in-flight requests before the lifespan
+    shutdown runs the remaining steps.
+    """
+
+    def __init__(self) -> None:
+        self.draining_since: float | None = None
+        self.closed_at: float | None = None
+
+    @property
+    def draining(self) -> bool:
+        return self.draining_since is not None
+
+    def drain(self) -> None:
+        if self.draining_since is None:
+            logger.info("Shutdown: readiness off")
+            self.draining_since = time.monotonic()
+
+    def close(self) -> None:
+        self.closed_at = time.monotonic()
+        if self.draining_since is None:
+            self.draining_since = self.closed_at
+        logger.info(
+            "Shutdown: load balancer drain took %.3f s",
+            self.closed_at - self.draining_since,
+        )
+
+    async def shut_down(self, steps: Sequence[Step]) -> None:
+        """Run `steps` in order, timing each; a failing step doesn't stop the rest."""
+        self.drain()
+        start = time.monotonic()
+        if self.closed_at is not None:
+            logger.info(
+                "Shutdown: in-flight requests took %.3f s", start - self.closed_at
+            )
+        for name, step in steps:
+            step_start = time.monotonic()
+            try:
+                await step()
+            except Exception:
+                logger.exception("Shutdown: %s failed", name)
+            else:
+                logger.info(
+                    "Shutdown: %s took %.3f s", name, time.monotonic() - step_start
+                )
+        logger.info("Shutdown: completed in %.3f s", time.monotonic() - start)
+
+
+lifecycle = Lifecycle()
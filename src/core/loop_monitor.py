@@ -0,0 +1,135 @@
+import asyncio
+import contextlib
+import logging
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from types import FrameType
+
+from src.core.config import settings
+from src.core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+STACK_LIMIT = 25
+
+loop_lag = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between when the lag probe should have woken up and when it did",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+
+def culprit(frame: FrameType) -> traceback.FrameSummary | None:
+    """Innermost project frame of a stack, i.e. where our code blocked."""
+    for summary in reversed(traceback.extract_stack(frame)):
+        if Path(summary.filename).is_relative_to(SRC_DIR):
+            return summary
+    return None
+
+
+class BlockDetector:
+    """Watchdog thread that dumps the loop thread's stack while it is stalled.
+
+    The loop bumps `heartbeat` every `threshold / 2`; when the heartbeat is
+    older than `threshold`, whatever the loop thread is executing right now
+    is the blocking call.
+    """
+
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+        self.heartbeat = time.monotonic()
+        self.loop_thread_id = threading.get_ident()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(
+            target=self.watch, name="loop-block-detector", daemon=True
+        )
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.thread.join()
+
+    def beat(self) -> None:
+        self.heartbeat = time.monotonic()
+
+    def watch(self) -> None:
+        reported = None
+        while not self.stopped.wait(self.threshold / 4):
+            heartbeat = self.heartbeat
+            stalled = time.monotonic() - heartbeat
+            if stalled < self.threshold or reported == heartbeat:
+                continue
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is not None:
+                reported = heartbeat
+                self.report(stalled, frame)
+
+    def report(self, stalled: float, frame: FrameType) -> None:
+        site = culprit(frame)
+        location = "unknown"
+        if site is not None:
+            path = Path(site.filename).relative_to(SRC_DIR.parent)
+            location = f"{path}:{site.lineno} in {site.name}"
+        logger.warning(
+            "Event loop blocked for %.0f ms at %s\n%s",
+            stalled * 1000,
+            location,
+            "".join(traceback.format_stack(frame, limit=STACK_LIMIT)),
+        )
+
+
+class LoopMonitor:
+    """Lag probe, cheap enough to run in production, plus the opt-in detector."""
+
+    def __init__(self, interval: float, block_threshold: float | None) -> None:
+        self.interval = interval
+        self.detector = (
+            BlockDetector(block_threshold) if block_threshold is not None else None
+        )
+        self.task: asyncio.Task[None] | None = None
+        self.loop_debug = False
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self.detector is not None:
+            self.detector.loop_thread_id = threading.get_ident()
+            self.detector.start()
+            # Per-callback timing from asyncio itself (no-op under uvloop)
+            self.loop_debug = loop.get_debug()
+            loop.slow_callback_duration = self.detector.threshold
+            loop.set_debug(True)
+        self.task = asyncio.create_task(self.probe())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.task
+        if self.detector is not None:
+            self.detector.stop()
+            asyncio.get_running_loop().set_debug(self.loop_debug)
+
+    async def probe(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = self.interval
+        if self.detector is not None:
+            interval = min(interval, self.detector.threshold / 2)
+
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            loop_lag.observe(max(loop.time() - expected, 0.0))
+            if self.detector is not None:
+                self.detector.beat()
+
+
+loop_monitor = LoopMonitor(
+    settings.loop_lag_interval_seconds,
+    settings.loop_block_threshold_ms / 1000 if settings.loop_block_detector else None,
+)
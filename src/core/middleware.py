@@ -0,0 +1,188 @@
+import logging
+import re
+from collections.abc import Sequence
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.config import settings
+from src.core.query_stats import QueryStats, current_stats
+from src.profiling.profiler import sampler, trigger
+
+logger = logging.getLogger(__name__)
+
+# Project middleware is written as plain ASGI callables: BaseHTTPMiddleware
+# adds a task group and request/response objects to every request.
+
+ALLOW_METHODS = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+
+
+class CORSMiddleware:
+    """Credentialed CORS with origin matching precompiled at startup.
+
+    Exact origins live in a frozenset, entries with a wildcard
+    (``https://*.example.com``) are joined into a single regex and ``*``
+    allows any origin. Preflights are answered here and cached by the
+    browser for `max_age` seconds.
+    """
+
+    def __init__(self, app: ASGIApp, allow_origins: Sequence[str], max_age: int):
+        self.app = app
+        self.allow_all = "*" in allow_origins
+        self.exact_origins = frozenset(o for o in allow_origins if "*" not in o)
+        patterns = [
+            re.escape(o).replace(r"\*", r"[^./]+")
+            for o in allow_origins
+            if "*" in o and o != "*"
+        ]
+        self.origin_regex = re.compile("|".join(patterns)) if patterns else None
+
+        self.simple_headers = [
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+        ]
+        self.preflight_headers = [
+            *self.simple_headers,
+            (b"access-control-allow-methods", ALLOW_METHODS),
+            (b"access-control-max-age", str(max_age).encode()),
+            (b"content-type", b"text/plain; charset=utf-8"),
+            (b"content-length", b"2"),
+        ]
+
+    def is_allowed(self, origin: str) -> bool:
+        if self.allow_all or origin in self.exact_origins:
+            return True
+        return self.origin_regex is not None and bool(
+            self.origin_regex.fullmatch(origin)
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":  # pragma: no cover
+            await self.app(scope, receive, send)
+            return
+
+        origin = request_method = request_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        allowed = self.is_allowed(origin.decode("latin-1"))
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            await self.preflight(send, origin if allowed else None, request_headers)
+            return
+        if not allowed:
+            await self.app(scope, receive, send)
+            return
+
+        cors_headers = [(b"access-control-allow-origin", origin), *self.simple_headers]
+
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *cors_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+    async def preflight(
+        self, send: Send, origin: bytes | None, request_headers: bytes | None
+    ) -> None:
+        if origin is None:
+            body = b"Disallowed CORS origin"
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 400,
+                    "headers": [
+                        (b"content-type", b"text/plain; charset=utf-8"),
+                        (b"content-length", str(len(body)).encode()),
+                        (b"vary", b"Origin"),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        headers = [(b"access-control-allow-origin", origin), *self.preflight_headers]
+        if request_headers:
+            headers.append((b"access-control-allow-headers", request_headers))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": b"OK"})
+
+
+class ProfilingMiddleware:
+    """Samples requests carrying ``X-Profile: <token>`` or armed by an admin.
+
+    Only installed when profiling is enabled. The profile id is returned in
+    ``X-Profile-Id`` and the result served by the admin profiling endpoints.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":  # pragma: no cover
+            await self.app(scope, receive, send)
+            return
+
+        token = next((v for n, v in scope["headers"] if n == b"x-profile"), None)
+        if not trigger.should_profile(scope["path"], token):
+            await self.app(scope, receive, send)
+            return
+
+        profile = sampler.start(f"{scope['method']} {scope['path']}")
+        profile_header = (b"x-profile-id", str(profile.id).encode())
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), profile_header]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop(profile)
+
+
+class QueryStatsMiddleware:
+    """Counts queries per request, reports them as ``Server-Timing`` outside
+    production and logs statements repeated often enough to look like N+1.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":  # pragma: no cover
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_stats.set(stats)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start" and not settings.is_production:
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"server-timing", stats.server_timing()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_stats.reset(token)
+            for statement, count in stats.repeated(settings.n_plus_one_threshold):
+                logger.warning(
+                    "Possible N+1 in %s %s: %d executions of %s",
+                    scope["method"],
+                    scope["path"],
+                    count,
+                    statement,
+                )
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN = "EXPLAIN (FORMAT JSON) "
+EXPLAIN_ANALYZE = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+# Row locks and functions with side effects (pg_notify, advisory locks,
+# sequences): statements using them are explained without running them
+SIDE_EFFECTS = re.compile(
+    r"\bFOR\s+(NO\s+KEY\s+|KEY\s+)?(UPDATE|SHARE)\b|\b(pg_\w+|nextval|setval)\s*\(",
+    re.IGNORECASE,
+)
+
+background_tasks: set[asyncio.Task[None]] = set()
+
+
+class QueryStats:
+    """Queries executed while handling one request."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(s, n) for s, n in self.statements.items() if n >= threshold]
+
+    def server_timing(self) -> bytes:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'.encode()
+
+
+current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def redact(parameters: Any, executemany: bool) -> Any:
+    if executemany:
+        return f"<{len(parameters)} rows>"
+    if isinstance(parameters, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in parameters.items()}
+    return [f"<{type(value).__name__}>" for value in parameters or ()]
+
+
+def log_slow_query(entry: dict[str, Any]) -> None:
+    logger.warning(json.dumps({"event": "slow_query", **entry}, default=str))
+
+
+def explain_prefix(statement: str) -> str:
+    """EXPLAIN ANALYZE executes the statement: only pure reads get it."""
+    pure_read = statement.lstrip()[:6].upper() == "SELECT"
+    return (
+        EXPLAIN_ANALYZE if pure_read and not SIDE_EFFECTS.search(statement) else EXPLAIN
+    )
+
+
+async def explain_slow_query(
+    engine: AsyncEngine, statement: str, parameters: Any, entry: dict[str, Any]
+) -> None:
+    try:
+        # Read-only and rolled back, in case the heuristic lets a write through
+        async with engine.connect() as conn:
+            await conn.execution_options(postgresql_readonly=True)
+            explain = explain_prefix(statement)
+            result = await conn.exec_driver_sql(explain + statement, parameters)
+            entry["plan"] = result.scalar_one()
+            await conn.rollback()
+    except Exception as exc:
+        entry["plan_error"] = repr(exc)
+    log_slow_query(entry)
+
+
+def report_slow_query(
+    conn: Connection,
+    statement: str,
+    parameters: Any,
+    executemany: bool,
+    duration: float,
+) -> None:
+    entry = {
+        "duration_ms": round(duration * 1000, 1),
+        "statement": statement,
+        "parameters": redact(parameters, executemany),
+    }
+    explainable = not executemany and statement.lstrip().upper().startswith(EXPLAINABLE)
+    if not explainable or random.random() >= settings.slow_query_explain_rate:
+        log_slow_query(entry)
+        return
+
+    engine = AsyncEngine(conn.engine)
+    task = asyncio.create_task(explain_slow_query(engine, statement, parameters, entry))
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def before_cursor_execute(conn: Connection, *_: Any) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def after_cursor_execute(
+    conn: Connection,
+    _cursor: Any,
+    statement: str,
+    parameters: Any,
+    _context: Any,
+    executemany: bool,
+) -> None:
+    duration = time.perf_counter() - conn.info["query_start"].pop()
+    if statement.startswith((EXPLAIN, EXPLAIN_ANALYZE)):
+        return
+
+    stats = current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    if duration * 1000 >= settings.slow_query_ms:
+        report_slow_query(conn, statement, parameters, executemany, duration)
+
+
+@event.listens_for(Engine, "handle_error")
+def handle_error(context: ExceptionContext) -> None:
+    # after_cursor_execute doesn't run for a failed statement
+    if context.connection is not None:
+        context.connection.info.pop("query_start", None)
@@ -0,0 +1,137 @@
+import math
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Protocol
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.config import RateLimitBackendEnum, settings
+from src.core.db import engine
+from src.core.models import RateLimitBucket
+
+# Limits use GCRA, a token bucket stored as one timestamp per key: the
+# "theoretical arrival time" (tat) advances by `interval` per allowed request
+# and a request is rejected while tat would run more than `period` ahead.
+
+
+class RateLimitBackend(Protocol):
+    async def hit(self, key: str, interval: float, period: float) -> float:
+        """Register a request; return 0 if allowed, else seconds to wait."""
+        ...
+
+
+class MemoryBackend:
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        # Least recently hit first, so eviction pops from the front
+        self.tats: OrderedDict[str, float] = OrderedDict()
+        self.evictions = 0
+
+    async def hit(self, key: str, interval: float, period: float) -> float:
+        now = time.monotonic()
+        tat = max(self.tats.get(key, now), now) + interval
+        retry_after = tat - now - period
+        if retry_after > 0:
+            return retry_after
+
+        if key in self.tats:
+            self.tats.move_to_end(key)
+        elif len(self.tats) >= self.max_keys:
+            self.evict(now)
+        self.tats[key] = tat
+        return 0.0
+
+    def evict(self, now: float) -> None:
+        # A key whose tat has passed holds a full bucket, same as a missing key.
+        # Sweeping them all once per `max_keys` evictions keeps eviction O(1)
+        # amortized; in between, drop the least recently hit key.
+        self.evictions += 1
+        if self.evictions % self.max_keys == 0:
+            for key in [key for key, tat in self.tats.items() if tat <= now]:
+                del self.tats[key]
+        while self.tats and next(iter(self.tats.values())) <= now:
+            self.tats.popitem(last=False)
+        if len(self.tats) >= self.max_keys:
+            self.tats.popitem(last=False)
+
+
+class PostgresBackend:
+    """Shared buckets for multi-node deployments, one round trip per request."""
+
+    purge_every = 1000
+
+    def __init__(self, db_engine: AsyncEngine) -> None:
+        self.engine = db_engine
+        self.hits = 0
+
+    async def hit(self, key: str, interval: float, period: float) -> float:
+        now = func.now()
+        step = timedelta(seconds=interval)
+        next_tat = func.greatest(RateLimitBucket.tat, now) + step
+        stmt = (
+            insert(RateLimitBucket)
+            .values(key=key, tat=now + step)
+            .on_conflict_do_update(
+                index_elements=[RateLimitBucket.key],
+                set_={"tat": next_tat},
+                where=next_tat - now <= timedelta(seconds=period),
+            )
+            .returning(RateLimitBucket.tat)
+        )
+
+        self.hits += 1
+        async with self.engine.begin() as conn:
+            if self.hits % self.purge_every == 0:
+                await conn.execute(
+                    delete(RateLimitBucket).where(RateLimitBucket.tat < now)
+                )
+            if (await conn.execute(stmt)).first() is not None:
+                return 0.0
+
+            ahead = await conn.scalar(
+                select(func.extract("epoch", RateLimitBucket.tat - now)).where(
+                    RateLimitBucket.key == key
+                )
+            )
+        return max(float(ahead or 0) + interval - period, 0.0)
+
+
+def create_backend() -> RateLimitBackend:
+    if settings.rate_limit_backend == RateLimitBackendEnum.postgres:
+        return PostgresBackend(engine)  # pragma: no cover
+    return MemoryBackend(settings.rate_limit_max_keys)
+
+
+backend = create_backend()
+
+
+class RateLimit:
+    """Route dependency limiting each client IP to `requests` per `period`."""
+
+    def __init__(self, requests: int, period: float) -> None:
+        self.period = float(period)
+        self.interval = self.period / requests
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.rate_limit_enabled:
+            return
+
+        client = request.client.host if request.client else ""
+        key = f"{request.scope['route'].path}:{client}"
+        retry_after = await backend.hit(key, self.interval, self.period)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+
+oauth_rate_limit = RateLimit(
+    settings.rate_limit_oauth_requests,
+    settings.rate_limit_oauth_period_seconds,
+)
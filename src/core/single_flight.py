@@ -0,0 +1,30 @@
+import asyncio
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+
+class SingleFlight:
+    """One task per key, awaited by every concurrent caller of that key.
+
+    A finished task is dropped, so the next caller starts a new one;
+    subclasses override `finished` to keep outcomes around instead.
+    """
+
+    def __init__(self) -> None:
+        self.tasks: dict[str, asyncio.Task[Any]] = {}
+
+    async def join(
+        self, key: str, start: Callable[[], Coroutine[Any, Any, Any]]
+    ) -> Any:
+        task = self.tasks.get(key)
+        if task is None:
+            task = asyncio.create_task(start())
+            task.add_done_callback(lambda t: self.finished(key, t))
+            self.tasks[key] = task
+        # Shielded so a disconnecting client doesn't cancel the shared task
+        return await asyncio.shield(task)
+
+    def finished(self, key: str, task: asyncio.Task[Any]) -> None:
+        del self.tasks[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved; waiters re-raise it themselves
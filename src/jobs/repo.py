@@ -0,0 +1,156 @@
+from collections.abc import Sequence
+from datetime import timedelta
+from typing import Annotated, Any
+from uuid import UUID
+
+from fastapi import Depends
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from src.core.db import SessionDep
+from src.jobs.models import Job, JobStatus
+
+# Workers LISTEN on this channel; enqueueing notifies it on commit
+CHANNEL = "jobs"
+
+
+def claimed(job: Job) -> tuple[ColumnElement[bool], ...]:
+    """Still running under the claim that returned `job`: a reaped and
+    reclaimed job has another attempt number."""
+    return (
+        Job.id == job.id,
+        Job.status == JobStatus.running,
+        Job.attempts == job.attempts,
+    )
+
+
+class JobRepo:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def enqueue(
+        self, kind: str, payload: dict[str, Any], max_attempts: int
+    ) -> Job:
+        job = Job(kind=kind, payload=payload, max_attempts=max_attempts)
+        self.session.add(job)
+        await self.session.execute(select(func.pg_notify(CHANNEL, kind)))
+        await self.session.commit()
+        await self.session.refresh(job)
+        return job
+
+    async def get(self, id: UUID) -> Job | None:
+        return await self.session.get(Job, id)
+
+    async def list_recent(self, status: JobStatus | None, limit: int) -> Sequence[Job]:
+        stmt = select(Job).order_by(Job.created_at.desc()).limit(limit)
+        if status is not None:
+            stmt = stmt.where(Job.status == status)
+
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def claim(self, lease: float) -> Job | None:
+        """Lock the next due job for `lease` seconds, skipping rows other
+        workers are claiming."""
+        next_job = (
+            select(Job.id)
+            .where(Job.status == JobStatus.queued, Job.run_at <= func.now())
+            .order_by(Job.run_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(Job)
+            .where(Job.id == next_job)
+            .values(
+                status=JobStatus.running,
+                attempts=Job.attempts + 1,
+                started_at=func.now(),
+                locked_until=func.now() + timedelta(seconds=lease),
+            )
+            .returning(Job)
+        )
+
+        job = await self.session.scalar(stmt)
+        await self.session.commit()
+        return job
+
+    async def renew(self, job: Job, lease: float) -> bool:
+        """Extend the lease of a job this worker still holds."""
+        stmt = (
+            update(Job)
+            .where(*claimed(job))
+            .values(locked_until=func.now() + timedelta(seconds=lease))
+        )
+
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return bool(result.rowcount)  # type: ignore[attr-defined]
+
+    async def finish(
+        self, job: Job, error: str | None = None, retry_in: float | None = None
+    ) -> bool:
+        """Mark a claimed job succeeded, failed, or queued again in `retry_in` s.
+
+        Returns False when the claim was lost (the lease expired and the job
+        was reaped), leaving the row to its new owner.
+        """
+        if retry_in is not None:
+            values: dict[str, Any] = {
+                "status": JobStatus.queued,
+                "run_at": func.now() + timedelta(seconds=retry_in),
+            }
+        else:
+            values = {
+                "status": JobStatus.failed if error else JobStatus.succeeded,
+                "finished_at": func.now(),
+            }
+        stmt = (
+            update(Job)
+            .where(*claimed(job))
+            .values(locked_until=None, last_error=error, **values)
+        )
+
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return bool(result.rowcount)  # type: ignore[attr-defined]
+
+    async def release(self, job: Job) -> None:
+        """Queue a job interrupted by shutdown again, without using an attempt."""
+        stmt = (
+            update(Job)
+            .where(*claimed(job))
+            .values(
+                status=JobStatus.queued, attempts=Job.attempts - 1, locked_until=None
+            )
+        )
+
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+    async def reap(self) -> int:
+        """Requeue (or fail) running jobs whose worker lost its lease."""
+        exhausted = Job.attempts >= Job.max_attempts
+        stmt = (
+            update(Job)
+            .where(Job.status == JobStatus.running, Job.locked_until < func.now())
+            .values(
+                status=case((exhausted, JobStatus.failed), else_=JobStatus.queued),
+                finished_at=case((exhausted, func.now())),
+                locked_until=None,
+                last_error="Lease expired",
+            )
+        )
+
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return result.rowcount  # type: ignore[attr-defined]
+
+
+def get_job_repo(session: SessionDep) -> JobRepo:
+    return JobRepo(session)
+
+
+JobRepoDep = Annotated[JobRepo, Depends(get_job_repo)]
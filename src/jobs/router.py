@@ -0,0 +1,54 @@
+from typing import Annotated, Any
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from src.core.config import settings
+from src.core.deps import CurrentAdminDep
+from src.jobs import schemas, tasks
+from src.jobs.models import JobStatus
+from src.jobs.repo import JobRepoDep
+
+router = APIRouter(prefix="/admin/jobs", tags=["jobs"])
+
+
+@router.post(
+    "",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=schemas.JobOut,
+    summary="Queue a background job",
+)
+async def create_job(
+    data: schemas.JobIn, job_repo: JobRepoDep, _: CurrentAdminDep
+) -> Any:
+    if data.kind not in tasks.handlers:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_CONTENT, "Unknown job kind")
+    return await job_repo.enqueue(
+        data.kind, data.payload, data.max_attempts or settings.jobs_max_attempts
+    )
+
+
+@router.get(
+    "",
+    response_model=list[schemas.JobOut],
+    summary="List recent background jobs",
+)
+async def list_jobs(
+    job_repo: JobRepoDep,
+    _: CurrentAdminDep,
+    job_status: Annotated[JobStatus | None, Query(alias="status")] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+) -> Any:
+    return await job_repo.list_recent(job_status, limit)
+
+
+@router.get(
+    "/{job_id}",
+    response_model=schemas.JobOut,
+    summary="Get a background job",
+)
+async def read_job(job_id: UUID, job_repo: JobRepoDep, _: CurrentAdminDep) -> Any:
+    job = await job_repo.get(job_id)
+    if job is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Job not found")
+    return job
@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from src.jobs.models import JobStatus
+
+
+class JobIn(BaseModel):
+    kind: str
+    payload: dict[str, Any] = {}
+    max_attempts: int | None = Field(default=None, ge=1, le=100)
+
+
+class JobOut(BaseModel, from_attributes=True):
+    id: UUID
+    kind: str
+    payload: dict[str, Any]
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    last_error: str | None
+    run_at: datetime
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
@@ -0,0 +1,30 @@
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from src.auth import partitions
+from src.core.db import engine
+from src.stats import rollups
+
+Handler = Callable[[dict[str, Any]], Awaitable[None]]
+
+# Job kind -> coroutine run by the worker with the job payload. Handlers may
+# run more than once (retries, expired leases), so they must be idempotent.
+handlers: dict[str, Handler] = {}
+
+
+def register(kind: str) -> Callable[[Handler], Handler]:
+    def decorator(handler: Handler) -> Handler:
+        handlers[kind] = handler
+        return handler
+
+    return decorator
+
+
+@register("stats.backfill")
+async def backfill_stats(_: dict[str, Any]) -> None:
+    await rollups.backfill(engine)
+
+
+@register("auth_events.partitions")
+async def maintain_auth_event_partitions(_: dict[str, Any]) -> None:
+    await partitions.maintain_current_partitions(engine)
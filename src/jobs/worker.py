@@ -0,0 +1,179 @@
+import asyncio
+import contextlib
+import logging
+import random
+import signal
+import time
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from src.core.config import settings
+from src.core.db import engine
+from src.jobs import tasks
+from src.jobs.models import Job
+from src.jobs.repo import CHANNEL, JobRepo
+
+logger = logging.getLogger(__name__)
+
+# Renewals per lease period, so a few can fail before the lease runs out
+LEASE_RENEWALS = 3
+
+
+def backoff(attempts: int) -> float:
+    """Seconds before retrying after `attempts` failures: exponential, capped,
+    with jitter so jobs failing together don't retry together."""
+    delay = min(
+        settings.jobs_retry_base_seconds * 2 ** (attempts - 1),
+        settings.jobs_retry_max_seconds,
+    )
+    return delay * random.uniform(0.5, 1)
+
+
+class JobWorker:
+    """Runs queued jobs in `concurrency` slots.
+
+    Idle slots sleep until a NOTIFY on the jobs channel or `poll_interval`,
+    which also picks up retries coming due and expired leases. LISTEN needs
+    a session-level connection, so run workers against Postgres directly,
+    not through a transaction-mode pooler (they still work by polling).
+    """
+
+    def __init__(
+        self, db_engine: AsyncEngine, concurrency: int, poll_interval: float
+    ) -> None:
+        self.engine = db_engine
+        self.sessions = async_sessionmaker(db_engine, expire_on_commit=False)
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.wakeup = asyncio.Event()
+        self.stopping = asyncio.Event()
+
+    def notified(self, *_: Any) -> None:
+        # Waiters hold the old event; a fresh one catches the next NOTIFY
+        self.wakeup.set()
+        self.wakeup = asyncio.Event()
+
+    def stop(self) -> None:
+        self.stopping.set()
+        self.notified()
+
+    async def claim(self) -> Job | None:
+        async with self.sessions() as session:
+            return await JobRepo(session).claim(settings.jobs_lease_seconds)
+
+    async def execute(self, job: Job) -> None:
+        handler = tasks.handlers.get(job.kind)
+        error: str | None = None
+        retry_in: float | None = None
+        start = time.monotonic()
+        renewal = asyncio.create_task(self.renew(job))
+        try:
+            if handler is None:
+                raise LookupError(f"No handler for job kind {job.kind}")
+            await handler(job.payload)
+        except asyncio.CancelledError:
+            async with self.sessions() as session:
+                await JobRepo(session).release(job)
+            raise
+        except Exception as exc:
+            retry = handler is not None and job.attempts < job.max_attempts
+            logger.exception(
+                "Job %s (%s) failed, attempt %d of %d",
+                job.id,
+                job.kind,
+                job.attempts,
+                job.max_attempts,
+            )
+            error = repr(exc)
+            retry_in = backoff(job.attempts) if retry else None
+        else:
+            logger.info(
+                "Job %s (%s) succeeded in %.3f s",
+                job.id,
+                job.kind,
+                time.monotonic() - start,
+            )
+        finally:
+            renewal.cancel()
+
+        async with self.sessions() as session:
+            if not await JobRepo(session).finish(job, error, retry_in):
+                logger.warning(
+                    "Job %s (%s) lost its lease; outcome discarded", job.id, job.kind
+                )
+
+    async def renew(self, job: Job) -> None:
+        """Keep extending the lease while the handler runs."""
+        lease = settings.jobs_lease_seconds
+        while True:
+            await asyncio.sleep(lease / LEASE_RENEWALS)
+            try:
+                async with self.sessions() as session:
+                    if not await JobRepo(session).renew(job, lease):
+                        logger.warning("Job %s (%s) lost its lease", job.id, job.kind)
+                        return
+            except Exception:
+                logger.exception("Renewing the lease of job %s failed", job.id)
+
+    async def slot(self) -> None:
+        while not self.stopping.is_set():
+            wakeup = self.wakeup  # a NOTIFY during the claim wakes us at once
+            try:
+                job = await self.claim()
+                if job is not None:
+                    await self.execute(job)
+                    continue
+            except Exception:
+                # Database trouble; a claimed job is requeued once its lease expires
+                logger.exception("Claiming or finishing a job failed")
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(wakeup.wait(), self.poll_interval)
+
+    async def reap(self) -> None:
+        while not self.stopping.is_set():
+            try:
+                async with self.sessions() as session:
+                    if reaped := await JobRepo(session).reap():
+                        logger.warning("Reaped %d jobs with expired leases", reaped)
+            except Exception:
+                logger.exception("Reaping jobs failed")
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self.stopping.wait(), self.poll_interval)
+
+    async def run(self, shutdown_timeout: float) -> None:
+        """Run until `stop()`, then give running jobs `shutdown_timeout`
+        seconds before cancelling and requeueing them."""
+        async with self.engine.connect() as listener:
+            raw = await listener.get_raw_connection()
+            driver = raw.driver_connection
+            await driver.add_listener(CHANNEL, self.notified)  # type: ignore[union-attr]
+            slots = [asyncio.create_task(self.slot()) for _ in range(self.concurrency)]
+            try:
+                await self.reap()
+            finally:
+                _, pending = await asyncio.wait(slots, timeout=shutdown_timeout)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                await driver.remove_listener(CHANNEL, self.notified)  # type: ignore[union-attr]
+
+
+async def run_worker() -> None:  # pragma: no cover
+    worker = JobWorker(engine, settings.jobs_concurrency, settings.jobs_poll_seconds)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+    logger.info("Job worker started with %d slots", settings.jobs_concurrency)
+    await worker.run(settings.jobs_shutdown_seconds)
+    await engine.dispose()
+    logger.info("Job worker stopped")
+
+
+def main() -> None:  # pragma: no cover
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_worker())
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -2,11 +2,31 @@ from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
 from fastapi import APIRouter, FastAPI
-from fastapi.middleware.cors import CORSMiddleware
 
+from src.api_keys.router import router as api_keys_router
+from src.auth.events import auth_event_writer
+from src.auth.google_oauth import OAuthFlowError
+from src.auth.google_oauth import client as google_client
+from src.auth.partitions import maintain_current_partitions
+from src.auth.router import handle_oauth_flow_error
 from src.auth.router import router as auth_router
+from src.avatars.cache import client as avatar_client
+from src.avatars.router import router as avatars_router
 from src.core.config import settings
-from src.core.db import reinit_database
+from src.core.db import engine, reinit_database
+from src.core.lifecycle import lifecycle
+from src.core.loop_monitor import loop_monitor
+from src.core.middleware import (
+    CORSMiddleware,
+    ProfilingMiddleware,
+    QueryStatsMiddleware,
+)
+from src.jobs.router import router as jobs_router
+from src.monitoring.router import router as monitoring_router
+from src.profiling.profiler import sampler
+from src.profiling.router import router as profiling_router
+from src.stats.router import router as stats_router
+from src.users.activity import activity_tracker
 from src.users.router import router as users_router
 
 API_PREFIX = "/v1"
@@ -16,22 +36,50 @@ API_PREFIX = "/v1"
 async def lifespan(_: FastAPI) -> AsyncIterator[None]:
     if settings.reset_db_on_startup:
         await reinit_database()
+    await loop_monitor.start()
+    activity_tracker.start()
+    await maintain_current_partitions(engine)
+    auth_event_writer.start()
+    if settings.profiling_continuous:
+        sampler.ensure_running()
     yield
+    # Runs once the server has drained in-flight requests
+    await lifecycle.shut_down(
+        [
+            ("loop monitor", loop_monitor.stop),
+            ("profiler", sampler.close),
+            ("last_seen_at flush", activity_tracker.stop),
+            ("auth events flush", auth_event_writer.stop),
+            ("avatar HTTP pool", avatar_client.aclose),
+            ("Google HTTP pool", google_client.aclose),
+            ("database pool", engine.dispose),
+        ]
+    )
 
 
 app = FastAPI(lifespan=lifespan)
+app.add_exception_handler(OAuthFlowError, handle_oauth_flow_error)
+
+
+app.add_middleware(QueryStatsMiddleware)
 
+if settings.profiling_enabled:  # pragma: no cover
+    app.add_middleware(ProfilingMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    max_age=settings.cors_max_age,
 )
 
 router = APIRouter(prefix=API_PREFIX)
 router.include_router(users_router)
 router.include_router(auth_router)
+router.include_router(api_keys_router)
+router.include_router(avatars_router)
+router.include_router(profiling_router)
+router.include_router(stats_router)
+router.include_router(jobs_router)
 
 app.include_router(router)
+app.include_router(monitoring_router)
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Response, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.auth import google_oauth
+from src.core.db import SessionDep
+from src.core.deps import CurrentApiKeyDep
+from src.core.lifecycle import lifecycle
+from src.core.metrics import CONTENT_TYPE, render_metrics
+from src.monitoring import schemas
+
+router = APIRouter(tags=["monitoring"])
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Prometheus metrics of this worker",
+)
+async def read_metrics(_: CurrentApiKeyDep) -> PlainTextResponse:
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
+
+@router.get(
+    "/health/ready",
+    response_model=schemas.ReadinessOut,
+    summary="Readiness of this worker and state of its dependencies",
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {"model": schemas.ReadinessOut}},
+)
+async def read_readiness(
+    session: SessionDep, response: Response
+) -> schemas.ReadinessOut:
+    try:
+        await session.execute(text("SELECT 1"))
+        database = True
+    except (SQLAlchemyError, OSError):
+        database = False
+    if lifecycle.draining or not database:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    # An open Google circuit is reported but keeps the worker in rotation:
+    # every worker shares the outage, and only logins are affected.
+    return schemas.ReadinessOut(
+        draining=lifecycle.draining,
+        database=database,
+        google=google_oauth.google_breaker.state,
+    )
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+from src.core.circuit_breaker import CircuitState
+
+
+class ReadinessOut(BaseModel):
+    draining: bool
+    database: bool
+    google: CircuitState
@@ -0,0 +1,243 @@
+import asyncio
+import copy
+import itertools
+import secrets
+import sys
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any
+
+from src.core.config import settings
+
+ROOT_DIR = Path(__file__).resolve().parent.parent.parent
+MAX_STACKS = 10_000
+TRUNCATED = ("[truncated]",)
+
+_frame_names: dict[CodeType, str] = {}
+_ids = itertools.count(1)
+
+
+def frame_name(code: CodeType) -> str:
+    name = _frame_names.get(code)
+    if name is None:
+        path = Path(code.co_filename)
+        if path.is_relative_to(ROOT_DIR):
+            path = path.relative_to(ROOT_DIR)
+        name = f"{code.co_qualname} ({path}:{code.co_firstlineno})"
+        _frame_names[code] = name
+    return name
+
+
+def thread_stack(frame: FrameType | None, root: CodeType | None = None) -> list[str]:
+    """Names from the outermost frame (or `root`) down to `frame`."""
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame.f_code))
+        if frame.f_code is root:
+            break
+        frame = frame.f_back
+    names.reverse()
+    return names
+
+
+def task_stack(task: asyncio.Task[Any]) -> list[str]:
+    """Await chain of a suspended task, ending in an ``[await]`` marker."""
+    names = []
+    awaitable: Any = task.get_coro()
+    while (frame := getattr(awaitable, "cr_frame", None)) is not None:
+        names.append(frame_name(frame.f_code))
+        awaitable = awaitable.cr_await
+    names.append("[await]")
+    return names
+
+
+class Profile:
+    def __init__(self, name: str, interval: float) -> None:
+        self.id = next(_ids)
+        self.name = name
+        self.interval = interval
+        self.started = time.monotonic()
+        self.duration: float | None = None
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+
+    def add(self, stack: list[str]) -> None:
+        key = tuple(stack)
+        if key not in self.stacks and len(self.stacks) >= MAX_STACKS:
+            key = TRUNCATED
+        self.stacks[key] += 1
+
+    def finish(self) -> None:
+        self.duration = time.monotonic() - self.started
+
+    @property
+    def samples(self) -> int:
+        return self.stacks.total()
+
+    def to_collapsed(self) -> str:
+        return "".join(
+            f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.items()
+        )
+
+    def to_speedscope(self) -> dict[str, Any]:
+        frames: dict[str, int] = {}
+        samples = [
+            [frames.setdefault(name, len(frames)) for name in stack]
+            for stack in self.stacks
+        ]
+        weights = [count * self.interval for count in self.stacks.values()]
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "shared": {"frames": [{"name": name} for name in frames]},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": self.name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+
+class Sampler:
+    """Samples the event loop thread from a background thread.
+
+    Each tracked task gets a sample per tick: the live thread stack trimmed
+    to the task's coroutine while it runs, its await chain while suspended.
+    The continuous profile records the loop thread at a lower rate.
+    """
+
+    def __init__(self, interval: float, continuous_interval: float | None) -> None:
+        self.interval = interval
+        self.continuous_interval = continuous_interval
+        self.continuous = (
+            Profile("continuous", continuous_interval) if continuous_interval else None
+        )
+        self.tasks: dict[asyncio.Task[Any], Profile] = {}
+        self.finished: deque[Profile] = deque(maxlen=settings.profiling_keep)
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.loop_thread_id = 0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread: threading.Thread | None = None
+        self.closed = False
+
+    def ensure_running(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        if self.thread is None or not self.thread.is_alive():
+            self.closed = False
+            self.thread = threading.Thread(
+                target=self.run, name="profiler", daemon=True
+            )
+            self.thread.start()
+
+    async def close(self) -> None:
+        self.closed = True
+        self.wakeup.set()
+        if self.thread is not None:
+            await asyncio.to_thread(self.thread.join)
+
+    def start(self, name: str) -> Profile:
+        task = asyncio.current_task()
+        assert task is not None
+        profile = Profile(name, self.interval)
+        with self.lock:
+            self.tasks[task] = profile
+        self.ensure_running()
+        self.wakeup.set()
+        return profile
+
+    def stop(self, profile: Profile) -> None:
+        with self.lock:
+            self.tasks = {t: p for t, p in self.tasks.items() if p is not profile}
+        profile.finish()
+        self.finished.append(profile)
+
+    def get(self, id: int) -> Profile | None:
+        return next((p for p in self.finished if p.id == id), None)
+
+    def snapshot(self, profile: Profile) -> Profile:
+        """Copy of `profile` to render while this thread may still add to it."""
+        snapshot = copy.copy(profile)
+        with self.lock:
+            snapshot.stacks = Counter(profile.stacks)
+        return snapshot
+
+    def run(self) -> None:
+        next_continuous = time.monotonic()
+        while not self.closed:
+            # Sampling under the lock: once `stop()` returns, the profile is final
+            with self.lock:
+                tasks = list(self.tasks.items())
+                idle = not tasks and self.continuous is None
+                if not idle:
+                    next_continuous = self.sample(tasks, next_continuous)
+            if idle:
+                self.wakeup.wait()
+                self.wakeup.clear()
+                continue
+
+            time.sleep(self.interval if tasks else self.continuous_interval or 0)
+
+    def sample(
+        self,
+        tasks: list[tuple[asyncio.Task[Any], Profile]],
+        next_continuous: float,
+    ) -> float:
+        frame = sys._current_frames().get(self.loop_thread_id)
+        self.sample_tasks(frame, tasks)
+        now = time.monotonic()
+        if self.continuous is not None and now >= next_continuous:
+            self.continuous.add(thread_stack(frame))
+            next_continuous = now + self.continuous.interval
+        del frame
+        return next_continuous
+
+    def sample_tasks(
+        self, frame: FrameType | None, tasks: list[tuple[asyncio.Task[Any], Profile]]
+    ) -> None:
+        current = asyncio.current_task(self.loop) if tasks else None
+        for task, profile in tasks:
+            if task is not current:
+                profile.add(task_stack(task))
+                continue
+            root = getattr(task.get_coro(), "cr_frame", None)
+            profile.add(thread_stack(frame, root.f_code if root else None))
+
+
+class Trigger:
+    """Decides which requests get profiled: token header or armed by an admin."""
+
+    def __init__(self) -> None:
+        self.remaining = 0
+        self.path_prefix = "/"
+
+    def arm(self, requests: int, path_prefix: str) -> None:
+        self.remaining = requests
+        self.path_prefix = path_prefix
+
+    def should_profile(self, path: str, token: bytes | None) -> bool:
+        if token is not None and settings.profiling_token:
+            return secrets.compare_digest(token, settings.profiling_token.encode())
+        if self.remaining > 0 and path.startswith(self.path_prefix):
+            self.remaining -= 1
+            return True
+        return False
+
+
+trigger = Trigger()
+
+sampler = Sampler(
+    settings.profiling_interval_ms / 1000,
+    settings.profiling_continuous_interval_ms / 1000
+    if settings.profiling_continuous
+    else None,
+)
@@ -0,0 +1,62 @@
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Response, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from src.core.config import settings
+from src.core.deps import CurrentAdminDep
+from src.profiling import schemas
+from src.profiling.profiler import Profile, sampler, trigger
+
+router = APIRouter(prefix="/admin/profiling", tags=["profiling"])
+
+profile_not_found = HTTPException(status.HTTP_404_NOT_FOUND, "Profile not found")
+
+
+def render(profile: Profile, format: schemas.ProfileFormat) -> Response:
+    profile = sampler.snapshot(profile)
+    if format == schemas.ProfileFormat.collapsed:
+        return PlainTextResponse(profile.to_collapsed())
+    return JSONResponse(profile.to_speedscope())
+
+
+@router.post(
+    "/arm",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Profile the next requests matching a path prefix",
+)
+async def arm_profiling(data: schemas.ProfilingArm, _: CurrentAdminDep) -> None:
+    if not settings.profiling_enabled:
+        raise HTTPException(status.HTTP_409_CONFLICT, "Profiling is disabled")
+    trigger.arm(data.requests, data.path_prefix)
+
+
+@router.get(
+    "",
+    response_model=list[schemas.ProfileOut],
+    summary="List recent request profiles",
+)
+async def list_profiles(_: CurrentAdminDep) -> Any:
+    return list(sampler.finished)
+
+
+@router.get("/continuous", summary="Get the continuous worker profile")
+async def read_continuous_profile(
+    _: CurrentAdminDep,
+    format: schemas.ProfileFormat = schemas.ProfileFormat.speedscope,
+) -> Response:
+    if sampler.continuous is None:
+        raise profile_not_found
+    return render(sampler.continuous, format)
+
+
+@router.get("/{profile_id}", summary="Get a request profile")
+async def read_profile(
+    profile_id: int,
+    _: CurrentAdminDep,
+    format: schemas.ProfileFormat = schemas.ProfileFormat.speedscope,
+) -> Response:
+    profile = sampler.get(profile_id)
+    if profile is None:
+        raise profile_not_found
+    return render(profile, format)
@@ -0,0 +1,20 @@
+from enum import StrEnum
+
+from pydantic import BaseModel, Field
+
+
+class ProfileFormat(StrEnum):
+    speedscope = "speedscope"
+    collapsed = "collapsed"
+
+
+class ProfilingArm(BaseModel):
+    requests: int = Field(default=1, ge=1, le=100)
+    path_prefix: str = "/"
+
+
+class ProfileOut(BaseModel, from_attributes=True):
+    id: int
+    name: str
+    duration: float | None
+    samples: int
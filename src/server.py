@@ -0,0 +1,130 @@
+import copy
+import math
+import os
+import random
+import socket
+import time
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+import uvicorn
+from uvicorn.config import LOGGING_CONFIG
+from uvicorn.supervisors import ChangeReload, Multiprocess
+
+from src.core.config import settings
+from src.core.lifecycle import lifecycle
+
+APP = "src.main:app"
+# Each worker's request limit is raised by up to this fraction, so workers
+# started together don't all restart together
+MAX_REQUESTS_JITTER = 0.1
+CGROUP_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: affinity mask capped by the cgroup v2 quota."""
+    cpus = len(os.sched_getaffinity(0))
+    try:
+        quota, period = CGROUP_CPU_MAX.read_text().split()
+        limit = math.ceil(int(quota) / int(period))
+    except (OSError, ValueError):
+        return cpus
+    return max(1, min(cpus, limit))
+
+
+def worker_count() -> int:
+    if settings.server_reload:
+        return 1
+    return settings.server_workers or available_cpus()
+
+
+def jittered(limit: int) -> int:
+    return limit + random.randint(0, int(limit * MAX_REQUESTS_JITTER))
+
+
+def log_config() -> dict[str, Any]:
+    """Uvicorn's logging config, with our own loggers at INFO."""
+    config = copy.deepcopy(LOGGING_CONFIG)
+    config["loggers"]["src"] = {
+        "handlers": ["default"],
+        "level": "INFO",
+        "propagate": False,
+    }
+    return config
+
+
+def server_options() -> dict[str, Any]:
+    return {
+        "host": settings.host,
+        "port": settings.port,
+        "workers": worker_count(),
+        "reload": settings.server_reload,
+        "loop": "uvloop",
+        "http": "httptools",
+        "timeout_keep_alive": settings.server_keep_alive_timeout,
+        "backlog": settings.server_backlog,
+        "limit_concurrency": settings.server_limit_concurrency,
+        "limit_max_requests": settings.server_limit_max_requests,
+        "proxy_headers": settings.server_proxy_headers,
+        "forwarded_allow_ips": settings.server_forwarded_allow_ips,
+        "timeout_graceful_shutdown": settings.server_graceful_shutdown_seconds,
+        "log_config": log_config(),
+    }
+
+
+class GracefulServer(uvicorn.Server):
+    """Uvicorn server that fails readiness before it stops accepting requests.
+
+    The first SIGTERM/SIGINT only starts draining; the listener is closed
+    `server_drain_delay_seconds` later, once the load balancer has noticed.
+    Uvicorn then waits up to `server_graceful_shutdown_seconds` for in-flight
+    requests and runs the lifespan shutdown. A second signal of either kind
+    exits at once, without waiting for requests or running the lifespan
+    shutdown (uvicorn alone only forces on a second SIGINT).
+    """
+
+    async def serve(self, sockets: list[socket.socket] | None = None) -> None:
+        # Runs in each worker process, so every worker draws its own limit
+        if self.config.limit_max_requests is not None:
+            self.config.limit_max_requests = jittered(self.config.limit_max_requests)
+        await super().serve(sockets)
+
+    def handle_exit(self, sig: int, frame: FrameType | None) -> None:
+        if lifecycle.draining or self.should_exit:
+            self.force_exit = True
+            super().handle_exit(sig, frame)
+        elif settings.server_drain_delay_seconds:
+            lifecycle.drain()
+        else:
+            super().handle_exit(sig, frame)
+
+    async def on_tick(self, counter: int) -> bool:
+        if (
+            not self.should_exit
+            and lifecycle.draining_since is not None
+            and time.monotonic() - lifecycle.draining_since
+            >= settings.server_drain_delay_seconds
+        ):
+            self.should_exit = True
+        should_exit = await super().on_tick(counter)
+        if should_exit and lifecycle.closed_at is None:
+            lifecycle.close()
+        return should_exit
+
+
+def main() -> None:  # pragma: no cover
+    # uvicorn.run() with our Server class
+    config = uvicorn.Config(APP, **server_options())
+    server = GracefulServer(config)
+    if config.should_reload:
+        ChangeReload(config, target=server.run, sockets=[config.bind_socket()]).run()
+    elif config.workers > 1 or config.limit_max_requests is not None:
+        # The supervisor restarts workers exiting at their request limit
+        Multiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
+    else:
+        server.run()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,27 @@
+import time
+from datetime import date
+
+from src.core.config import settings
+from src.stats.schemas import UserStatsOut
+
+
+class StatsCache:
+    """Stats responses per `(until, days)`, served for `ttl` seconds."""
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.entries: dict[tuple[date, int], tuple[float, UserStatsOut]] = {}
+
+    def get(self, until: date, days: int) -> UserStatsOut | None:
+        entry = self.entries.get((until, days))
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, until: date, days: int, stats: UserStatsOut) -> None:
+        now = time.monotonic()
+        self.entries = {k: e for k, e in self.entries.items() if e[0] >= now}
+        self.entries[until, days] = (now + self.ttl, stats)
+
+
+stats_cache = StatsCache(settings.stats_cache_seconds)
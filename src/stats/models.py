@@ -0,0 +1,16 @@
+from datetime import date
+
+from sqlalchemy import Date
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.db import Base
+
+
+class DailyUserStats(Base):
+    """Per UTC day rollup, maintained by src/stats/rollups.py."""
+
+    __tablename__ = "daily_user_stats"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    signups: Mapped[int] = mapped_column(server_default="0")
+    active_users: Mapped[int] = mapped_column(server_default="0")
@@ -0,0 +1,32 @@
+from collections.abc import Sequence
+from datetime import date
+from typing import Annotated
+
+from fastapi import Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.db import SessionDep
+from src.stats.models import DailyUserStats
+
+
+class StatsRepo:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_daily(self, since: date, until: date) -> Sequence[DailyUserStats]:
+        stmt = (
+            select(DailyUserStats)
+            .where(DailyUserStats.day.between(since, until))
+            .order_by(DailyUserStats.day)
+        )
+
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+
+def get_stats_repo(session: SessionDep) -> StatsRepo:
+    return StatsRepo(session)
+
+
+StatsRepoDep = Annotated[StatsRepo, Depends(get_stats_repo)]
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import operator
+from collections.abc import Callable, Sequence
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import (
+    ColumnExpressionArgument,
+    Date,
+    Integer,
+    Select,
+    cast,
+    column,
+    func,
+    literal,
+    select,
+    union,
+    values,
+)
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.sql.elements import ColumnElement
+
+from src.auth.models import AuthEventKind, auth_events
+from src.core.db import engine
+from src.stats.models import DailyUserStats
+from src.users.models import User
+
+logger = logging.getLogger(__name__)
+
+# daily_user_stats is incremented by the transactions that change it: the
+# users upsert counts signups, the last_seen_at flush counts the first
+# activity of each user per UTC day. Reads never touch users. Writers upsert
+# their rollup row last, just before committing: it is shared by everyone
+# signing up or active that day, and holding its lock longer serialises them.
+# `python -m src.stats.rollups` backfills it, e.g. after the first deploy.
+
+Merge = Callable[[ColumnElement[int], ColumnElement[int]], ColumnElement[int]]
+
+
+def utc_day(timestamp: ColumnExpressionArgument[Any]) -> ColumnElement[date]:
+    return cast(func.timezone("UTC", timestamp), Date)
+
+
+def add_counts(column: str, counts: Select[Any], merge: Merge = operator.add) -> Insert:
+    """Upsert `(day, count)` rows of `counts` into one rollup column."""
+    stmt = insert(DailyUserStats).from_select(["day", column], counts)
+    current = DailyUserStats.__table__.c[column]
+    return stmt.on_conflict_do_update(
+        index_elements=[DailyUserStats.day],
+        set_={column: merge(current, stmt.excluded[column])},
+    )
+
+
+def add_signup(created_at: datetime) -> Insert:
+    return add_counts("signups", select(utc_day(literal(created_at)), literal(1)))
+
+
+def add_active_users(counts: Sequence[tuple[date, int]]) -> Insert:
+    active = values(column("day", Date), column("count", Integer), name="active").data(
+        list(counts)
+    )
+    return add_counts("active_users", select(active.c.day, active.c.count))
+
+
+async def backfill(db_engine: AsyncEngine) -> None:
+    """Recount the rollups from users and auth_events.
+
+    Signups are exact. Past activity only survives as each user's latest
+    `last_seen_at` and their logins still in auth_events, so active users
+    are a lower bound; counts are merged with GREATEST and never lowered.
+    """
+    signup_day = utc_day(User.created_at)
+    signups = select(signup_day, func.count()).group_by(signup_day)
+
+    seen = union(
+        select(User.id, utc_day(User.last_seen_at).label("day")).where(
+            User.last_seen_at.is_not(None)
+        ),
+        select(auth_events.c.user_id, utc_day(auth_events.c.occurred_at)).where(
+            auth_events.c.kind == AuthEventKind.login_succeeded,
+            auth_events.c.user_id.is_not(None),
+        ),
+    ).subquery()
+    active = select(seen.c.day, func.count()).group_by(seen.c.day)
+
+    async with db_engine.begin() as conn:
+        days = await conn.execute(add_counts("signups", signups, func.greatest))
+        logger.info("Backfilled signups of %d days", days.rowcount)
+        days = await conn.execute(add_counts("active_users", active, func.greatest))
+        logger.info("Backfilled active users of %d days", days.rowcount)
+
+
+async def run_backfill() -> None:  # pragma: no cover
+    await backfill(engine)
+    await engine.dispose()
+
+
+def main() -> None:  # pragma: no cover
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_backfill())
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
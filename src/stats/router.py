@@ -0,0 +1,45 @@
+from datetime import UTC, datetime, timedelta
+from typing import Annotated
+
+from fastapi import APIRouter, Query
+
+from src.core.deps import CurrentAdminDep
+from src.stats import cache, schemas
+from src.stats.repo import StatsRepoDep
+
+router = APIRouter(prefix="/admin/stats", tags=["stats"])
+
+MAX_DAYS = 366
+
+
+@router.get(
+    "/users",
+    response_model=schemas.UserStatsOut,
+    summary="Daily signups and active users of the last days",
+)
+async def read_user_stats(
+    stats_repo: StatsRepoDep,
+    _: CurrentAdminDep,
+    days: Annotated[int, Query(ge=1, le=MAX_DAYS)] = 30,
+) -> schemas.UserStatsOut:
+    until = datetime.now(UTC).date()
+    stats = cache.stats_cache.get(until, days)
+    if stats is not None:
+        return stats
+
+    since = until - timedelta(days=days - 1)
+    rows = {row.day: row for row in await stats_repo.get_daily(since, until)}
+    daily = [
+        schemas.DailyUserStatsOut.model_validate(rows[day])
+        if day in rows
+        else schemas.DailyUserStatsOut(day=day, signups=0, active_users=0)
+        for day in (since + timedelta(days=offset) for offset in range(days))
+    ]
+    stats = schemas.UserStatsOut(
+        since=since,
+        until=until,
+        signups=sum(day.signups for day in daily),
+        days=daily,
+    )
+    cache.stats_cache.put(until, days, stats)
+    return stats
@@ -0,0 +1,16 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class DailyUserStatsOut(BaseModel, from_attributes=True):
+    day: date
+    signups: int
+    active_users: int
+
+
+class UserStatsOut(BaseModel):
+    since: date
+    until: date
+    signups: int
+    days: list[DailyUserStatsOut]
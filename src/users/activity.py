@@ -0,0 +1,151 @@
+import asyncio
+import contextlib
+import logging
+import math
+import time
+from datetime import UTC, datetime
+from uuid import UUID
+
+from sqlalchemy import DateTime, column, func, or_, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.config import settings
+from src.core.db import engine
+from src.stats import rollups
+from src.users.models import User
+
+logger = logging.getLogger(__name__)
+
+# Two bind parameters per row; asyncpg allows 32767 per statement
+FLUSH_BATCH = 5000
+
+
+class ActivityTracker:
+    """Write-behind buffer for `users.last_seen_at`.
+
+    Requests only touch a dict: activity is coalesced per user, admitted at
+    most once per `interval` and written every `flush_interval` seconds with
+    one ``UPDATE ... FROM (VALUES ...)`` per batch. At most `max_pending`
+    users are buffered; past that, new users are dropped until the next
+    flush, which is started early. A failed flush puts its users back, so
+    the next one retries them.
+
+    The first write of a user on a UTC day also counts them as active that
+    day in the stats rollup. Activity within `interval` of the previous one
+    is not admitted, so a user's first moments of a day may go uncounted.
+    """
+
+    def __init__(
+        self,
+        db_engine: AsyncEngine,
+        interval: float,
+        flush_interval: float,
+        max_pending: int,
+    ) -> None:
+        self.engine = db_engine
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending: dict[UUID, datetime] = {}
+        self.admitted: dict[UUID, float] = {}
+        self.dropped = 0
+        self.wakeup = asyncio.Event()
+        self.stopping = asyncio.Event()
+        self.task: asyncio.Task[None] | None = None
+
+    def seen(self, user_id: UUID) -> None:
+        if user_id in self.pending:
+            self.pending[user_id] = datetime.now(UTC)
+            return
+
+        now = time.monotonic()
+        if self.admitted.get(user_id, -math.inf) > now - self.interval:
+            return
+        if len(self.pending) >= self.max_pending:
+            self.dropped += 1
+            self.wakeup.set()
+            return
+        self.admitted[user_id] = now
+        self.pending[user_id] = datetime.now(UTC)
+
+    async def flush(self) -> None:
+        batch, self.pending = list(self.pending.items()), {}
+        cutoff = time.monotonic() - self.interval
+        self.admitted = {u: t for u, t in self.admitted.items() if t > cutoff}
+
+        for start in range(0, len(batch), FLUSH_BATCH):
+            seen = values(
+                column("id", PG_UUID(as_uuid=True)),
+                column("last_seen_at", DateTime(timezone=True)),
+                name="seen",
+            ).data(batch[start : start + FLUSH_BATCH])
+            # Users not seen yet on the day of their activity. Rows locked by a
+            # concurrent flush are re-checked, so each user counts once a day.
+            first_today = (
+                update(User)
+                .where(
+                    User.id == seen.c.id,
+                    or_(
+                        User.last_seen_at.is_(None),
+                        User.last_seen_at
+                        < func.date_trunc("day", seen.c.last_seen_at, "UTC"),
+                    ),
+                )
+                .values(last_seen_at=seen.c.last_seen_at)
+                .returning(seen.c.last_seen_at)
+                .cte("first_today")
+            )
+            day = rollups.utc_day(first_today.c.last_seen_at)
+            count_active = select(day, func.count()).group_by(day)
+            later = (
+                update(User)
+                .where(User.id == seen.c.id, User.last_seen_at < seen.c.last_seen_at)
+                .values(last_seen_at=seen.c.last_seen_at)
+            )
+            try:
+                async with self.engine.begin() as conn:
+                    active = (await conn.execute(count_active)).tuples().all()
+                    await conn.execute(later)
+                    if active:
+                        await conn.execute(rollups.add_active_users(active))
+            except Exception:
+                self.requeue(batch[start:])
+                raise
+
+    def requeue(self, batch: list[tuple[UUID, datetime]]) -> None:
+        # Activity recorded since the flush started is newer and wins
+        for user_id, seen_at in batch:
+            if user_id not in self.pending and len(self.pending) >= self.max_pending:
+                self.dropped += 1
+                continue
+            self.pending.setdefault(user_id, seen_at)
+
+    def start(self) -> None:
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        # Not cancelled: a flush in progress has taken its batch from pending
+        if self.task is not None:
+            self.stopping.set()
+            self.wakeup.set()
+            await self.task
+        await self.flush()
+
+    async def run(self) -> None:
+        while not self.stopping.is_set():
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self.wakeup.wait(), self.flush_interval)
+            self.wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Flushing last_seen_at failed")
+
+
+activity_tracker = ActivityTracker(
+    engine,
+    settings.last_seen_interval_seconds,
+    settings.last_seen_flush_seconds,
+    settings.last_seen_max_pending,
+)
@@ -1,4 +1,5 @@
 import uuid
+from datetime import datetime
 
 from sqlalchemy import DateTime, func
 from sqlalchemy.dialects.postgresql import UUID
@@ -25,3 +26,4 @@ class User(Base):
     created_at: Mapped["DateTime"] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
+    last_seen_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
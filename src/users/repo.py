@@ -2,12 +2,14 @@ from typing import Annotated
 from uuid import UUID
 
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import literal_column, select
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth import schemas
+from src.avatars import cache
 from src.core.db import SessionDep
+from src.stats import rollups
 from src.users.models import User
 
 
@@ -23,7 +25,20 @@ class UserRepo:
 
         return user
 
+    async def get_picture_url(self, id: UUID) -> str | None:
+        stmt = select(User.picture_url).where(User.id == id)
+
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
     async def update_or_create_google_user(self, g_user: schemas.GoogleUser) -> User:
+        # RETURNING subqueries see the table as it was before the upsert, and
+        # xmax is only zero on rows this statement inserted
+        previous_picture_url = (
+            select(User.picture_url)
+            .where(User.google_id == g_user.sub)
+            .scalar_subquery()
+        )
         stmt = (
             insert(User)
             .values(
@@ -42,12 +57,17 @@ class UserRepo:
                     "picture_url": g_user.picture,
                 },
             )
-            .returning(User)
+            .returning(User, previous_picture_url, literal_column("xmax") == 0)
         )
 
         result = await self.session.execute(stmt)
-        user = result.scalar_one()
+        user, previous_url, inserted = result.one()
+        if inserted:
+            await self.session.execute(rollups.add_signup(user.created_at))
         await self.session.commit()
+
+        if previous_url is not None and previous_url != user.picture_url:
+            await cache.avatar_cache.discard(previous_url)
         return user
 
 
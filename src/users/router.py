@@ -1,7 +1,8 @@
 from typing import Any
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 
+from src.avatars import cache
 from src.core.deps import CurrentUserDep
 from src.users import schemas
 
@@ -13,5 +14,14 @@ router = APIRouter(prefix="/users", tags=["users"])
     response_model=schemas.UserOut,
     summary="Get current user",
 )
-async def read_current_user(current_user: CurrentUserDep) -> Any:
-    return current_user
+async def read_current_user(request: Request, current_user: CurrentUserDep) -> Any:
+    user = schemas.UserOut.model_validate(current_user, from_attributes=True)
+    if current_user.picture_url is not None:
+        user.avatar_url = str(
+            request.url_for(
+                "read_avatar",
+                user_id=current_user.id,
+                version=cache.version(current_user.picture_url),
+            )
+        )
+    return user
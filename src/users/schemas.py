@@ -9,5 +9,6 @@ class UserOut(BaseModel):
     given_name: str
     family_name: str
     picture_url: str
+    avatar_url: str | None = None
     email: str
     created_at: datetime
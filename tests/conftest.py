@@ -1,10 +1,12 @@
 from collections.abc import AsyncGenerator
 from datetime import UTC, datetime, timedelta
+from pathlib import Path
 from typing import Any
 
 import jwt
 import pytest
 from faker import Faker
+from fastapi import status
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -12,7 +14,11 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 
+from src.auth import events, google_oauth
 from src.auth.schemas import GoogleUser
+from src.avatars import cache
+from src.core import rate_limit
+from src.core.circuit_breaker import CircuitBreaker
 from src.core.config import settings
 from src.core.db import Base, get_session
 from src.core.security import (
@@ -20,6 +26,7 @@ from src.core.security import (
     create_access_token,
 )
 from src.main import API_PREFIX, app
+from src.stats import cache as stats_cache_module
 from src.users.models import User
 
 
@@ -28,6 +35,61 @@ def anyio_backend() -> str:
     return "asyncio"
 
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits(monkeypatch: pytest.MonkeyPatch) -> None:
+    backend = rate_limit.MemoryBackend(settings.rate_limit_max_keys)
+    monkeypatch.setattr(rate_limit, "backend", backend)
+
+
+@pytest.fixture(autouse=True)
+def reset_code_exchange(monkeypatch: pytest.MonkeyPatch) -> None:
+    code_exchange = google_oauth.CodeExchange(settings.google_code_cache_seconds)
+    monkeypatch.setattr(google_oauth, "code_exchange", code_exchange)
+
+
+@pytest.fixture(autouse=True)
+def google_breaker(monkeypatch: pytest.MonkeyPatch) -> CircuitBreaker:
+    breaker = CircuitBreaker(
+        "google",
+        google_oauth.google_breaker.thresholds,
+        google_oauth.google_breaker.failures,
+    )
+    monkeypatch.setattr(google_oauth, "google_breaker", breaker)
+    return breaker
+
+
+@pytest.fixture(autouse=True)
+def avatar_cache(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> cache.AvatarCache:
+    avatar_cache = cache.AvatarCache(
+        tmp_path / "avatars",
+        settings.avatar_cache_max_bytes,
+        settings.avatar_max_image_bytes,
+    )
+    monkeypatch.setattr(cache, "avatar_cache", avatar_cache)
+    return avatar_cache
+
+
+@pytest.fixture(autouse=True)
+def stats_cache(monkeypatch: pytest.MonkeyPatch) -> stats_cache_module.StatsCache:
+    stats_cache = stats_cache_module.StatsCache(settings.stats_cache_seconds)
+    monkeypatch.setattr(stats_cache_module, "stats_cache", stats_cache)
+    return stats_cache
+
+
+@pytest.fixture(autouse=True)
+def auth_event_writer(
+    monkeypatch: pytest.MonkeyPatch, engine: AsyncEngine
+) -> events.AuthEventWriter:
+    writer = events.AuthEventWriter(
+        engine,
+        settings.auth_events_queue_size,
+        settings.auth_events_batch_size,
+        flush_interval=0.01,
+    )
+    monkeypatch.setattr(events, "auth_event_writer", writer)
+    return writer
+
+
 @pytest.fixture(scope="session")
 async def engine() -> AsyncGenerator[AsyncEngine]:
     engine = create_async_engine(settings.test_database_url)
@@ -127,3 +189,19 @@ async def auth_client(client: AsyncClient, db_user: User) -> AsyncClient:
     access_token = create_access_token(db_user.id)
     client.cookies.set(AUTH_COOKIE_NAME, access_token, domain="test.local")
     return client
+
+
+@pytest.fixture
+async def admin_client(
+    auth_client: AsyncClient, session: AsyncSession, db_user: User
+) -> AsyncClient:
+    db_user.is_admin = True
+    await session.flush()
+    return auth_client
+
+
+@pytest.fixture
+async def api_key(admin_client: AsyncClient) -> dict[str, Any]:
+    response = await admin_client.post("/api-keys", json={"name": "billing"})
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()
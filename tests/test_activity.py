@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import uuid
+from collections.abc import AsyncGenerator
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.users import activity
+from src.users.activity import ActivityTracker, activity_tracker
+from src.users.models import User
+
+MAX_PENDING = 2
+
+
+@pytest.fixture
+def tracker(engine: AsyncEngine) -> ActivityTracker:
+    return ActivityTracker(
+        engine, interval=60, flush_interval=0.01, max_pending=MAX_PENDING
+    )
+
+
+@pytest.fixture
+async def user_ids(engine: AsyncEngine) -> AsyncGenerator[list[uuid.UUID]]:
+    ids = [uuid.uuid4() for _ in range(2)]
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User),
+            [
+                {"id": id, "google_id": str(id), "email": f"{id}@example.com"}
+                for id in ids
+            ],
+        )
+    yield ids
+    async with engine.begin() as conn:
+        await conn.execute(delete(User).where(User.id.in_(ids)))
+
+
+async def last_seen(engine: AsyncEngine, ids: list[uuid.UUID]) -> list[datetime | None]:
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            select(User.last_seen_at).where(User.id.in_(ids)).order_by(User.id)
+        )
+        return list(result.scalars())
+
+
+async def test_current_user_is_recorded(
+    auth_client: AsyncClient, db_user: User
+) -> None:
+    await auth_client.get("/users/me")
+
+    assert db_user.id in activity_tracker.pending
+
+
+def test_activity_is_coalesced_and_rate_capped(tracker: ActivityTracker) -> None:
+    user_id = uuid.uuid4()
+
+    tracker.seen(user_id)
+    first = tracker.pending[user_id]
+    tracker.seen(user_id)
+
+    assert list(tracker.pending) == [user_id]
+    assert tracker.pending[user_id] >= first
+
+    tracker.pending.clear()
+    tracker.seen(user_id)
+    assert not tracker.pending
+
+
+def test_overflow_is_dropped_and_flushes_early(tracker: ActivityTracker) -> None:
+    for _ in range(MAX_PENDING + 1):
+        tracker.seen(uuid.uuid4())
+
+    assert len(tracker.pending) == MAX_PENDING
+    assert tracker.dropped == 1
+    assert tracker.wakeup.is_set()
+
+
+async def test_flush_writes_batches(
+    monkeypatch: pytest.MonkeyPatch,
+    engine: AsyncEngine,
+    tracker: ActivityTracker,
+    user_ids: list[uuid.UUID],
+) -> None:
+    monkeypatch.setattr(activity, "FLUSH_BATCH", 1)
+    for user_id in user_ids:
+        tracker.seen(user_id)
+    seen_at = dict(tracker.pending)
+
+    await tracker.flush()
+
+    assert not tracker.pending
+    assert await last_seen(engine, sorted(user_ids)) == [
+        seen_at[user_id] for user_id in sorted(user_ids)
+    ]
+
+
+async def test_flush_never_moves_last_seen_back(
+    engine: AsyncEngine, tracker: ActivityTracker, user_ids: list[uuid.UUID]
+) -> None:
+    tracker.seen(user_ids[0])
+    seen_at = tracker.pending[user_ids[0]]
+    await tracker.flush()
+
+    tracker.pending[user_ids[0]] = seen_at - timedelta(minutes=1)
+    await tracker.flush()
+
+    assert await last_seen(engine, user_ids[:1]) == [seen_at]
+
+
+async def test_runs_in_background_and_flushes_on_stop(
+    engine: AsyncEngine, tracker: ActivityTracker, user_ids: list[uuid.UUID]
+) -> None:
+    tracker.start()
+    tracker.seen(user_ids[0])
+    await asyncio.sleep(0.05)
+    assert await last_seen(engine, user_ids[:1]) != [None]
+
+    tracker.flush_interval = 60
+    tracker.seen(user_ids[1])
+    await tracker.stop()
+
+    assert None not in await last_seen(engine, user_ids)
+
+
+async def test_stop_lets_a_running_flush_finish(
+    monkeypatch: pytest.MonkeyPatch,
+    engine: AsyncEngine,
+    tracker: ActivityTracker,
+    user_ids: list[uuid.UUID],
+) -> None:
+    flushing = asyncio.Event()
+    flush = tracker.flush
+
+    async def slow_flush() -> None:
+        batch = dict(tracker.pending)
+        tracker.pending = {}
+        flushing.set()
+        await asyncio.sleep(0.05)
+        tracker.pending = batch | tracker.pending
+        await flush()
+
+    monkeypatch.setattr(tracker, "flush", slow_flush)
+    tracker.flush_interval = 60
+    tracker.start()
+    tracker.seen(user_ids[0])
+    tracker.wakeup.set()
+    await flushing.wait()
+    tracker.seen(user_ids[1])
+    await tracker.stop()
+
+    assert tracker.task is not None
+    assert tracker.task.done()
+    assert None not in await last_seen(engine, user_ids)
+
+
+async def test_failed_flush_is_logged(caplog: pytest.LogCaptureFixture) -> None:
+    broken = create_async_engine("postgresql+asyncpg://nobody@127.0.0.1:1/none")
+    tracker = ActivityTracker(broken, interval=60, flush_interval=0.01, max_pending=1)
+    tracker.pending[uuid.uuid4()] = datetime.now(UTC)
+
+    with caplog.at_level(logging.ERROR):
+        tracker.start()
+        await asyncio.sleep(0.05)
+        assert tracker.task is not None
+        tracker.task.cancel()
+
+    assert "Flushing last_seen_at failed" in caplog.text
+    await broken.dispose()
+
+
+async def test_failed_flush_is_retried(
+    monkeypatch: pytest.MonkeyPatch,
+    engine: AsyncEngine,
+    tracker: ActivityTracker,
+    user_ids: list[uuid.UUID],
+) -> None:
+    monkeypatch.setattr(activity, "FLUSH_BATCH", 1)
+    for user_id in user_ids:
+        tracker.pending[user_id] = datetime.now(UTC) - timedelta(minutes=1)
+    broken = create_async_engine("postgresql+asyncpg://nobody@127.0.0.1:1/none")
+    tracker.engine = broken
+
+    newer = datetime.now(UTC)
+    with pytest.raises(OSError):
+        task = asyncio.create_task(tracker.flush())
+        await asyncio.sleep(0)  # the batch is taken, its connection pending
+        assert not tracker.pending
+        tracker.pending[user_ids[0]] = newer
+        tracker.seen(uuid.uuid4())
+        await task
+
+    # The user seen meanwhile takes the last slot; their newer activity wins
+    assert len(tracker.pending) == MAX_PENDING
+    assert tracker.pending[user_ids[0]] == newer
+    assert tracker.dropped == 1
+
+    tracker.engine = engine
+    await tracker.flush()
+    await broken.dispose()
+    assert await last_seen(engine, [user_ids[0]]) == [newer]
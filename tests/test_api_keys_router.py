@@ -0,0 +1,107 @@
+from datetime import UTC, datetime
+from typing import Any
+from uuid import uuid4
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from src.api_keys import keys
+from src.api_keys.schemas import ApiKeyOut
+from src.core import hashing
+
+
+@pytest.fixture
+def verify_calls(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    calls: list[str] = []
+    verify_secret = hashing.verify_secret
+
+    async def counting_verify(secret_hash: str, secret: str) -> bool:
+        calls.append(secret)
+        return await verify_secret(secret_hash, secret)
+
+    monkeypatch.setattr(hashing, "verify_secret", counting_verify)
+    return calls
+
+
+async def test_create_api_key(api_key: dict[str, Any]) -> None:
+    assert api_key["name"] == "billing"
+    assert api_key["key"].startswith(f"{api_key['prefix']}{keys.SEPARATOR}")
+
+
+async def test_create_api_key_requires_admin(auth_client: AsyncClient) -> None:
+    response = await auth_client.post("/api-keys", json={"name": "billing"})
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+async def test_api_key_auth(
+    client: AsyncClient, api_key: dict[str, Any], verify_calls: list[str]
+) -> None:
+    headers = {"X-API-Key": api_key["key"]}
+
+    for _ in range(3):
+        response = await client.get("/api-keys/me", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["id"] == api_key["id"]
+
+    # Later calls are served from the verification cache
+    assert verify_calls == [api_key["key"]]
+
+
+@pytest.mark.parametrize(
+    "key", [None, "no-separator", "unknown.prefix", "{prefix}.wrong-secret"]
+)
+async def test_api_key_auth_rejected(
+    client: AsyncClient, api_key: dict[str, Any], key: str | None
+) -> None:
+    headers = {} if key is None else {"X-API-Key": key.format(**api_key)}
+
+    response = await client.get("/api-keys/me", headers=headers)
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+async def test_revoke_api_key(
+    admin_client: AsyncClient, api_key: dict[str, Any]
+) -> None:
+    headers = {"X-API-Key": api_key["key"]}
+    response = await admin_client.get("/api-keys/me", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    response = await admin_client.delete(f"/api-keys/{api_key['id']}")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    response = await admin_client.get("/api-keys/me", headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = await admin_client.delete(f"/api-keys/{api_key['id']}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_revoke_unknown_api_key(admin_client: AsyncClient) -> None:
+    response = await admin_client.delete(f"/api-keys/{uuid4()}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_verification_cache_bounded() -> None:
+    max_entries = 2
+    cache = keys.VerificationCache(ttl=60, max_entries=max_entries)
+    api_key = ApiKeyOut(id=uuid4(), name="a", prefix="p", created_at=datetime.now(UTC))
+
+    for i in range(5):
+        cache.put(str(i), api_key)
+
+    assert len(cache.entries) == max_entries
+    assert cache.get("4") == api_key
+    assert cache.get("0") is None
+
+
+def test_verification_cache_drops_expired_entries() -> None:
+    cache = keys.VerificationCache(ttl=-1, max_entries=10)
+    api_key = ApiKeyOut(id=uuid4(), name="a", prefix="p", created_at=datetime.now(UTC))
+
+    for i in range(5):
+        cache.put(str(i), api_key)
+    cache.put("4", api_key)
+
+    assert list(cache.entries) == [cache.digest("4")]
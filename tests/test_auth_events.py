@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import uuid
+from collections.abc import AsyncGenerator
+from datetime import UTC, date, datetime
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.auth import events, partitions
+from src.auth.events import AuthEventWriter
+from src.auth.models import AuthEventKind, auth_events
+from src.core.security import AUTH_COOKIE_NAME
+from src.users.models import User
+
+BATCH_SIZE = 2
+
+
+@pytest.fixture
+async def stored_events(engine: AsyncEngine) -> AsyncGenerator[None]:
+    yield
+    async with engine.begin() as conn:
+        await conn.execute(delete(auth_events))
+
+
+async def read_events(engine: AsyncEngine) -> list[Any]:
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            select(auth_events).order_by(auth_events.c.occurred_at)
+        )
+        return list(result)
+
+
+def queued(writer: AuthEventWriter) -> list[tuple[Any, ...]]:
+    return list(writer.queue._queue)  # type: ignore[attr-defined]
+
+
+async def test_logout_is_recorded(
+    auth_client: AsyncClient, auth_event_writer: AuthEventWriter, db_user: User
+) -> None:
+    await auth_client.post("/auth/logout")
+
+    [(_, kind, user_id, reason, ip)] = queued(auth_event_writer)
+    assert (kind, str(user_id), reason, ip) == (
+        AuthEventKind.logout,
+        str(db_user.id),
+        None,
+        "127.0.0.1",
+    )
+
+
+async def test_rejected_token_is_recorded(
+    client: AsyncClient, auth_event_writer: AuthEventWriter
+) -> None:
+    client.cookies.set(AUTH_COOKIE_NAME, "not-a-jwt")
+    await client.get("/users/me")
+
+    [event] = queued(auth_event_writer)
+    assert event[1:4] == (
+        AuthEventKind.token_rejected,
+        None,
+        "Invalid or expired token",
+    )
+
+
+@pytest.mark.parametrize(
+    ("params", "reason"),
+    [
+        ({"error": "access_denied" * 1000}, "google_error"),
+        ({"state": "STATE"}, "missing_code"),
+        ({"code": "CODE", "state": "STATE"}, "invalid_state"),
+    ],
+)
+async def test_failed_login_is_recorded(
+    client: AsyncClient,
+    auth_event_writer: AuthEventWriter,
+    params: dict[str, str],
+    reason: str,
+) -> None:
+    await client.get("/auth/google/callback", params=params)
+
+    [event] = queued(auth_event_writer)
+    assert event[1:4] == (AuthEventKind.login_failed, None, reason)
+
+
+@pytest.mark.usefixtures("stored_events")
+async def test_events_are_copied_in_batches(
+    engine: AsyncEngine, auth_event_writer: AuthEventWriter
+) -> None:
+    user_id = uuid.uuid4()
+    auth_event_writer.batch_size = BATCH_SIZE
+    written = events.events_written.value
+
+    auth_event_writer.start()
+    for _ in range(BATCH_SIZE + 1):
+        auth_event_writer.record(AuthEventKind.login_succeeded, user_id=user_id)
+    await asyncio.sleep(0.05)
+    auth_event_writer.record(AuthEventKind.logout, user_id=user_id)
+    await auth_event_writer.stop()
+
+    rows = await read_events(engine)
+    assert [row.kind for row in rows] == ["login_succeeded"] * 3 + ["logout"]
+    assert {row.user_id for row in rows} == {user_id}
+    assert events.events_written.value == written + len(rows)
+
+
+def test_full_queue_drops_events(engine: AsyncEngine) -> None:
+    writer = AuthEventWriter(engine, max_queue=1, batch_size=1, flush_interval=1)
+    dropped = events.events_dropped.value
+
+    for _ in range(3):
+        writer.record(AuthEventKind.logout)
+
+    assert writer.queue.qsize() == 1
+    assert events.events_dropped.value == dropped + 2
+
+
+async def test_failed_batch_is_counted(caplog: pytest.LogCaptureFixture) -> None:
+    broken = create_async_engine("postgresql+asyncpg://nobody@127.0.0.1:1/none")
+    writer = AuthEventWriter(broken, max_queue=10, batch_size=1, flush_interval=1)
+    failed = events.events_failed.value
+
+    with caplog.at_level(logging.ERROR):
+        writer.start()
+        writer.record(AuthEventKind.logout)
+        await asyncio.sleep(0.05)
+        await writer.stop()
+
+    assert "Writing 1 auth events failed" in caplog.text
+    assert events.events_failed.value == failed + 1
+    await broken.dispose()
+
+
+@pytest.mark.usefixtures("stored_events")
+async def test_partition_maintenance(engine: AsyncEngine) -> None:
+    early = datetime(2000, 1, 2, 12, tzinfo=UTC)
+    async with engine.begin() as conn:
+        await conn.execute(insert(auth_events).values(occurred_at=early, kind="logout"))
+
+    created, dropped = await partitions.maintain_partitions(
+        engine, date(2000, 1, 1), days_ahead=1, retention_days=30
+    )
+    assert created == ["auth_events_20000101", "auth_events_20000102"]
+    assert dropped == []
+    async with engine.connect() as conn:
+        moved = await conn.scalar(text("SELECT count(*) FROM auth_events_20000102"))
+    assert moved == 1
+
+    created, dropped = await partitions.maintain_partitions(
+        engine, date(2000, 2, 1), days_ahead=0, retention_days=30
+    )
+    assert created == ["auth_events_20000201"]
+    assert dropped == ["auth_events_20000101"]
+
+    created, dropped = await partitions.maintain_partitions(
+        engine, date(2000, 5, 1), days_ahead=-1, retention_days=0
+    )
+    assert (created, dropped) == ([], ["auth_events_20000102", "auth_events_20000201"])
+
+
+async def test_current_partitions(engine: AsyncEngine) -> None:
+    today = partitions.partition_name(datetime.now(UTC).date())
+
+    created, _ = await partitions.maintain_current_partitions(engine)
+    created_again, _ = await partitions.maintain_current_partitions(engine)
+
+    assert today in created
+    assert created_again == []
+    async with engine.begin() as conn:
+        for name in created:
+            await conn.execute(text(f"DROP TABLE {name}"))
@@ -1,17 +1,22 @@
+import time
+from collections.abc import AsyncGenerator
 from typing import Any
 from urllib.parse import parse_qs, urlparse
 
 import pytest
 from fastapi import status
-from httpx import AsyncClient, Response
+from httpx import ASGITransport, AsyncClient, Response
 from respx import Router
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth import google_oauth
 from src.auth.schemas import GoogleUser
+from src.core.circuit_breaker import CircuitBreaker
 from src.core.config import settings
+from src.core.db import get_session
 from src.core.security import AUTH_COOKIE_NAME, OAUTH_STATE_COOKIE_NAME
+from src.main import app
 from src.users.models import User
 from tests.helpers import (
     assert_does_not_set_auth_cookie,
@@ -216,3 +221,78 @@ async def test_google_callback_missing_code(client: AsyncClient) -> None:
     assert_redirect_to_error(response)
     assert_does_not_set_auth_cookie(response, client)
     assert_state_cookie_deleted(response, client)
+
+
+@pytest.mark.usefixtures("mock_id_token_validation")
+async def test_google_callback_duplicate_code_reuses_exchange(
+    respx_mock: Router,
+    client: AsyncClient,
+    google_id_token: str,
+) -> None:
+    token_route = respx_mock.post(google_oauth.TOKEN_URL)
+    token_route.return_value = Response(
+        status.HTTP_200_OK, json={"id_token": google_id_token}
+    )
+    state = google_oauth.generate_token_state()
+    params = {"code": "FAKE_CODE", "state": state}
+
+    for _ in range(2):
+        client.cookies.set(OAUTH_STATE_COOKIE_NAME, state, domain="test.local")
+        response = await client.get("/auth/google/callback", params=params)
+        assert_redirect(response)
+
+    assert token_route.call_count == 1
+
+
+@pytest.mark.usefixtures("mock_id_token_validation")
+async def test_google_callback_code_replay_from_other_client_fails(
+    respx_mock: Router,
+    client: AsyncClient,
+    google_id_token: str,
+) -> None:
+    # Google codes are single-use: the replay must reach Google and be refused
+    responses = [
+        Response(status.HTTP_200_OK, json={"id_token": google_id_token}),
+        Response(status.HTTP_400_BAD_REQUEST, json={"error": "invalid_grant"}),
+    ]
+    token_route = respx_mock.post(google_oauth.TOKEN_URL)
+    token_route.side_effect = responses
+    state = google_oauth.generate_token_state()
+    params = {"code": "FAKE_CODE", "state": state}
+    client.cookies.set(OAUTH_STATE_COOKIE_NAME, state, domain="test.local")
+    assert_redirect(await client.get("/auth/google/callback", params=params))
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app, client=("203.0.113.7", 4444)),
+        base_url=client.base_url,
+    ) as attacker:
+        attacker.cookies.set(OAUTH_STATE_COOKIE_NAME, state, domain="test.local")
+        response = await attacker.get("/auth/google/callback", params=params)
+        assert_does_not_set_auth_cookie(response, attacker)
+
+    assert_redirect_to_error(response)
+    assert token_route.call_count == len(responses)
+
+
+async def test_google_callback_open_circuit_skips_google_and_db(
+    respx_mock: Router,
+    client: AsyncClient,
+    google_breaker: CircuitBreaker,
+) -> None:
+    token_route = respx_mock.post(google_oauth.TOKEN_URL)
+    google_breaker.opened_at = time.monotonic()
+
+    async def unexpected_get_session() -> AsyncGenerator[AsyncSession]:
+        raise AssertionError("DB session opened")  # pragma: no cover
+        yield  # pragma: no cover
+
+    app.dependency_overrides[get_session] = unexpected_get_session
+    state = google_oauth.generate_token_state()
+    client.cookies.set(OAUTH_STATE_COOKIE_NAME, state, domain="test.local")
+
+    response = await client.get(
+        "/auth/google/callback", params={"code": "FAKE_CODE", "state": state}
+    )
+
+    assert_redirect_to_error(response)
+    assert not token_route.called
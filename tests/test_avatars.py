@@ -0,0 +1,262 @@
+import asyncio
+import os
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi import status
+from httpx import AsyncClient, Response
+from respx import Router
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.schemas import GoogleUser
+from src.avatars import cache
+from src.avatars.cache import AvatarCache
+from src.users.models import User
+from src.users.repo import UserRepo
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+GOOGLE_PICTURE = "https://lh3.googleusercontent.com/a/ACg8ocK=s96-c"
+RESIZED_SIZE = 64
+MAX_IMAGE_BYTES = 1024
+
+
+def image(content: bytes = PNG) -> Response:
+    return Response(
+        status.HTTP_200_OK, content=content, headers={"content-type": "image/png"}
+    )
+
+
+async def avatar_url(client: AsyncClient) -> str:
+    response = await client.get("/users/me")
+    url: str = response.json()["avatar_url"]
+    return url
+
+
+async def test_avatar_is_fetched_once_and_cached(
+    respx_mock: Router, auth_client: AsyncClient, db_user: User
+) -> None:
+    upstream = respx_mock.get(db_user.picture_url).mock(return_value=image())
+    url = await avatar_url(auth_client)
+
+    for _ in range(2):
+        response = await auth_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == PNG
+        assert response.headers["content-type"] == "image/png"
+        assert "immutable" in response.headers["cache-control"]
+    assert upstream.call_count == 1
+
+    response = await auth_client.get(
+        url, headers={"if-none-match": response.headers["etag"]}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+async def test_concurrent_misses_share_one_fetch(
+    respx_mock: Router, auth_client: AsyncClient, db_user: User
+) -> None:
+    upstream = respx_mock.get(db_user.picture_url).mock(return_value=image())
+    url = await avatar_url(auth_client)
+
+    responses = await asyncio.gather(*(auth_client.get(url) for _ in range(3)))
+
+    assert [r.status_code for r in responses] == [status.HTTP_200_OK] * 3
+    assert upstream.call_count == 1
+
+
+async def test_google_avatar_is_resized_upstream(
+    respx_mock: Router,
+    session: AsyncSession,
+    auth_client: AsyncClient,
+    db_user: User,
+) -> None:
+    db_user.picture_url = GOOGLE_PICTURE
+    await session.flush()
+    resized = respx_mock.get(f"{GOOGLE_PICTURE[:-6]}=s{RESIZED_SIZE}-c").mock(
+        return_value=image(b"resized")
+    )
+
+    response = await auth_client.get(
+        await avatar_url(auth_client), params={"size": RESIZED_SIZE - 10}
+    )
+
+    assert response.content == b"resized"
+    assert resized.called
+
+
+@pytest.mark.parametrize(
+    "upstream",
+    [
+        Response(status.HTTP_404_NOT_FOUND),
+        Response(
+            status.HTTP_200_OK, text="<html>", headers={"content-type": "text/html"}
+        ),
+        image(b"x" * (MAX_IMAGE_BYTES + 1)),
+        httpx.ConnectError("refused"),
+    ],
+)
+async def test_unusable_upstream_is_bad_gateway(
+    respx_mock: Router,
+    auth_client: AsyncClient,
+    db_user: User,
+    avatar_cache: AvatarCache,
+    upstream: Response | Exception,
+) -> None:
+    avatar_cache.max_image_bytes = MAX_IMAGE_BYTES
+    respx_mock.get(db_user.picture_url).mock(side_effect=[upstream])
+
+    response = await auth_client.get(await avatar_url(auth_client))
+
+    assert response.status_code == status.HTTP_502_BAD_GATEWAY
+
+
+async def test_stale_version_not_found(auth_client: AsyncClient, db_user: User) -> None:
+    url = await avatar_url(auth_client)
+
+    response = await auth_client.get(url.replace(str(db_user.id), "0" * 32))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = await auth_client.get(url[:-4] + "0000")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_refs_survive_restart(
+    respx_mock: Router, avatar_cache: AvatarCache
+) -> None:
+    respx_mock.get(GOOGLE_PICTURE).mock(return_value=image())
+    avatar = await avatar_cache.fetch(GOOGLE_PICTURE, None)
+
+    restarted = AvatarCache(avatar_cache.blobs.parent, 1024, 1024)
+
+    assert await restarted.lookup(cache.version(GOOGLE_PICTURE), None) == avatar
+    assert await restarted.lookup(cache.version(GOOGLE_PICTURE), RESIZED_SIZE) is None
+
+
+async def test_least_recently_used_blob_is_evicted(
+    respx_mock: Router, tmp_path: Path
+) -> None:
+    avatar_cache = AvatarCache(
+        tmp_path, max_bytes=3 * len(PNG) - 1, max_image_bytes=1024
+    )
+    urls = [f"https://example.com/{i}.png" for i in range(3)]
+    for i, url in enumerate(urls):
+        respx_mock.get(url).mock(return_value=image(PNG + bytes([i])))
+
+    first = await avatar_cache.fetch(urls[0], None)
+    second = await avatar_cache.fetch(urls[1], None)
+    os.utime(first.path, (0, 0))
+    os.utime(second.path, (1, 1))
+    assert await avatar_cache.lookup(cache.version(urls[0]), None) == first
+    await avatar_cache.fetch(urls[2], None)
+
+    assert first.path.exists()
+    assert not second.path.exists()
+    assert await avatar_cache.lookup(cache.version(urls[1]), None) is None
+
+
+async def test_cache_hits_bump_mtime_in_batches(
+    respx_mock: Router, avatar_cache: AvatarCache
+) -> None:
+    respx_mock.get(GOOGLE_PICTURE).mock(return_value=image())
+    avatar = await avatar_cache.fetch(GOOGLE_PICTURE, None)
+    os.utime(avatar.path, (0, 0))
+
+    assert await avatar_cache.lookup(cache.version(GOOGLE_PICTURE), None) == avatar
+    assert avatar_cache.touching is not None
+    await avatar_cache.touching
+
+    assert avatar.path.stat().st_mtime > 0
+    assert avatar_cache.touching is None
+
+
+async def test_blob_evicted_by_another_worker_is_forgotten(
+    respx_mock: Router, avatar_cache: AvatarCache
+) -> None:
+    respx_mock.get(GOOGLE_PICTURE).mock(return_value=image())
+    avatar = await avatar_cache.fetch(GOOGLE_PICTURE, None)
+    avatar.path.unlink()
+
+    await avatar_cache.lookup(cache.version(GOOGLE_PICTURE), None)
+    assert avatar_cache.touching is not None
+    await avatar_cache.touching
+
+    assert await avatar_cache.lookup(cache.version(GOOGLE_PICTURE), None) is None
+
+
+async def test_blob_evicted_while_indexed_is_fetched_again(
+    respx_mock: Router,
+    auth_client: AsyncClient,
+    db_user: User,
+    avatar_cache: AvatarCache,
+) -> None:
+    upstream = respx_mock.get(db_user.picture_url).mock(return_value=image())
+    url = await avatar_url(auth_client)
+    await auth_client.get(url)
+    fetched = upstream.call_count
+    for blob in avatar_cache.blobs.iterdir():
+        blob.unlink()  # by another worker's eviction
+
+    response = await auth_client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.content == PNG
+    assert upstream.call_count == fetched + 1
+
+
+async def test_blob_evicted_on_every_attempt_is_unavailable(
+    respx_mock: Router,
+    monkeypatch: pytest.MonkeyPatch,
+    auth_client: AsyncClient,
+    db_user: User,
+    avatar_cache: AvatarCache,
+) -> None:
+    respx_mock.get(db_user.picture_url).mock(return_value=image())
+
+    async def evicted(avatar: cache.Avatar) -> None:
+        avatar_cache.forget({avatar.path})
+
+    monkeypatch.setattr(avatar_cache, "stat", evicted)
+
+    response = await auth_client.get(await avatar_url(auth_client))
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+async def test_workers_sharing_a_directory_stay_bounded(
+    respx_mock: Router, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(cache, "RESCAN_EVERY", 1)
+    max_bytes = 3 * len(PNG) - 1
+    first, second = (AvatarCache(tmp_path, max_bytes, 1024) for _ in range(2))
+    urls = [f"https://example.com/{i}.png" for i in range(3)]
+    for i, url in enumerate(urls):
+        respx_mock.get(url).mock(return_value=image(PNG + bytes([i])))
+
+    await second.fetch(urls[0], None)
+    await first.fetch(urls[1], None)
+    await second.fetch(urls[2], None)
+
+    assert second.scan() <= max_bytes
+
+
+async def test_changed_picture_discards_old_variants(
+    respx_mock: Router,
+    session: AsyncSession,
+    avatar_cache: AvatarCache,
+    google_user: GoogleUser,
+) -> None:
+    assert google_user.picture is not None
+    respx_mock.get(google_user.picture).mock(return_value=image())
+    await avatar_cache.fetch(google_user.picture, None)
+    user_repo = UserRepo(session)
+
+    await user_repo.update_or_create_google_user(google_user)
+    assert await avatar_cache.lookup(cache.version(google_user.picture), None)
+
+    new_user = google_user.model_copy(update={"picture": GOOGLE_PICTURE})
+    user = await user_repo.update_or_create_google_user(new_user)
+
+    assert user.picture_url == GOOGLE_PICTURE
+    assert await avatar_cache.lookup(cache.version(google_user.picture), None) is None
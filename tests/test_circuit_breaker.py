@@ -0,0 +1,118 @@
+import time
+
+import pytest
+
+from src.core.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    CircuitThresholds,
+)
+
+MIN_CALLS = 4
+SLOW_CALL_SECONDS = 0.02
+OPEN_SECONDS = 0.05
+
+
+class UnavailableError(Exception):
+    pass
+
+
+@pytest.fixture
+def breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        "test",
+        CircuitThresholds(
+            window=60,
+            min_calls=MIN_CALLS,
+            failure_rate=0.5,
+            slow_call_seconds=SLOW_CALL_SECONDS,
+            slow_call_rate=0.5,
+            open_seconds=OPEN_SECONDS,
+        ),
+        failures=(UnavailableError,),
+    )
+
+
+def succeed(breaker: CircuitBreaker, seconds: float = 0) -> None:
+    with breaker.guard():
+        time.sleep(seconds)
+
+
+def fail(breaker: CircuitBreaker) -> None:
+    with pytest.raises(UnavailableError), breaker.guard():
+        raise UnavailableError
+
+
+def trip(breaker: CircuitBreaker) -> None:
+    for _ in range(MIN_CALLS):
+        fail(breaker)
+    assert breaker.state == CircuitState.open
+
+
+def test_opens_on_failure_rate(breaker: CircuitBreaker) -> None:
+    for _ in range(MIN_CALLS // 2 + 1):
+        succeed(breaker)
+    for _ in range(MIN_CALLS // 2):
+        fail(breaker)
+    assert breaker.opened_at is None
+
+    fail(breaker)
+    assert breaker.state == CircuitState.open
+    with pytest.raises(CircuitOpenError):
+        succeed(breaker)
+
+
+def test_opens_on_slow_call_rate(breaker: CircuitBreaker) -> None:
+    for _ in range(MIN_CALLS):
+        succeed(breaker, SLOW_CALL_SECONDS)
+
+    assert breaker.state == CircuitState.open
+
+
+def test_other_exceptions_are_successes(breaker: CircuitBreaker) -> None:
+    for _ in range(MIN_CALLS):
+        with pytest.raises(ValueError), breaker.guard():
+            raise ValueError
+
+    assert breaker.state == CircuitState.closed
+
+
+def test_old_outcomes_leave_the_window(breaker: CircuitBreaker) -> None:
+    breaker.thresholds = breaker.thresholds._replace(window=0.01)
+    for _ in range(MIN_CALLS - 1):
+        fail(breaker)
+    time.sleep(0.02)
+    fail(breaker)
+
+    assert breaker.state == CircuitState.closed
+    assert len(breaker.outcomes) == 1
+
+
+def test_half_open_probe_closes_circuit(breaker: CircuitBreaker) -> None:
+    trip(breaker)
+    time.sleep(OPEN_SECONDS)
+    assert breaker.state == CircuitState.half_open
+
+    with breaker.guard(), pytest.raises(CircuitOpenError), breaker.guard():
+        pass  # only one probe at a time
+
+    assert breaker.opened_at is None
+    succeed(breaker)
+
+
+def test_failed_probe_reopens_circuit(breaker: CircuitBreaker) -> None:
+    trip(breaker)
+    time.sleep(OPEN_SECONDS)
+
+    fail(breaker)
+
+    assert breaker.state == CircuitState.open
+
+
+def test_calls_started_before_opening_are_ignored(breaker: CircuitBreaker) -> None:
+    with breaker.guard():
+        trip(breaker)
+
+    assert breaker.state == CircuitState.open
+    assert not breaker.outcomes
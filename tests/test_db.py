@@ -0,0 +1,90 @@
+import asyncio
+import socket
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.core import db
+from src.core.config import settings
+from src.users.models import User
+
+PGBOUNCER_PORT = 6432  # compose.yml / CI pgbouncer service
+LOCAL_POOL_SIZE = 2
+CONCURRENCY = 20
+
+
+@pytest.fixture
+def pooler_options(monkeypatch: pytest.MonkeyPatch) -> dict[str, Any]:
+    monkeypatch.setattr(settings, "postgres_external_pooler", True)
+    monkeypatch.setattr(settings, "postgres_pool_size", 0)
+    return db.engine_options()
+
+
+@pytest.fixture
+async def pgbouncer_engine(
+    pooler_options: dict[str, Any],
+) -> AsyncGenerator[AsyncEngine]:
+    with socket.socket() as sock:
+        if sock.connect_ex((settings.postgres_host, PGBOUNCER_PORT)) != 0:
+            pytest.skip("PgBouncer is not running")  # pragma: no cover
+    url = settings.test_database_url.replace(
+        f":{settings.postgres_port}/", f":{PGBOUNCER_PORT}/"
+    )
+    engine = create_async_engine(url, **pooler_options)
+    yield engine
+    await engine.dispose()
+
+
+async def run_queries(engine: AsyncEngine) -> None:
+    async def worker(n: int) -> None:
+        for i in range(10):
+            async with engine.connect() as conn:
+                stmt = select(User.id).where(User.email == f"{n}-{i}@example.com")
+                await conn.execute(stmt)
+                await conn.execute(
+                    text("SELECT CAST(:n AS int) + CAST(:i AS int)"), {"n": n, "i": i}
+                )
+
+    await asyncio.gather(*(worker(n) for n in range(CONCURRENCY)))
+
+
+def test_direct_engine_options() -> None:
+    options = db.engine_options()
+
+    assert options["pool_size"] == settings.postgres_pool_size
+    assert "connect_args" not in options
+
+
+def test_external_pooler_engine_options(
+    monkeypatch: pytest.MonkeyPatch, pooler_options: dict[str, Any]
+) -> None:
+    assert pooler_options["poolclass"] is NullPool
+    connect_args = pooler_options["connect_args"]
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    name_func = connect_args["prepared_statement_name_func"]
+    assert name_func() != name_func()
+
+    monkeypatch.setattr(settings, "postgres_pool_size", LOCAL_POOL_SIZE)
+    options = db.engine_options()
+    assert (options["pool_size"], options["max_overflow"]) == (LOCAL_POOL_SIZE, 0)
+
+
+async def test_external_pooler_engine_runs_queries(
+    pooler_options: dict[str, Any],
+) -> None:
+    engine = create_async_engine(settings.test_database_url, **pooler_options)
+
+    await run_queries(engine)
+
+    await engine.dispose()
+
+
+async def test_through_pgbouncer(
+    pgbouncer_engine: AsyncEngine,
+) -> None:  # pragma: no cover
+    await run_queries(pgbouncer_engine)
@@ -0,0 +1,184 @@
+import asyncio
+import time
+from typing import Any
+from unittest.mock import Mock
+
+import httpx
+import pytest
+from fastapi import status
+from google.auth.exceptions import TransportError
+from httpx import Response
+from respx import Router
+
+from src.auth import google_oauth
+from src.auth.google_oauth import CodeExchange, GoogleUnavailableError, OAuthFlowError
+from src.auth.schemas import GoogleUser
+from src.core.circuit_breaker import CircuitBreaker
+from src.core.config import settings
+from src.core.metrics import render_metrics
+
+CALLBACK = ("CODE", "STATE", "127.0.0.1")
+
+
+@pytest.fixture
+def exchange_calls(
+    monkeypatch: pytest.MonkeyPatch, google_user: GoogleUser
+) -> list[str]:
+    calls: list[str] = []
+    consumed: set[str] = set()
+
+    async def fake_exchange_code(code: str) -> GoogleUser:
+        # Like Google: codes are single-use, outages don't consume them
+        first_call = code not in calls
+        calls.append(code)
+        await asyncio.sleep(0.01)
+        if code == "DOWN_CODE" and first_call:
+            raise GoogleUnavailableError("Code to id_token exchange failed")
+        if code == "BAD_CODE" or code in consumed:
+            raise OAuthFlowError("invalid_grant")
+        consumed.add(code)
+        return google_user
+
+    monkeypatch.setattr(google_oauth, "exchange_code", fake_exchange_code)
+    return calls
+
+
+async def test_concurrent_duplicates_share_exchange(
+    exchange_calls: list[str], google_user: GoogleUser
+) -> None:
+    code_exchange = CodeExchange(ttl=10)
+
+    users = await asyncio.gather(*(code_exchange.exchange(*CALLBACK) for _ in range(5)))
+
+    assert users == [google_user] * 5
+    assert exchange_calls == ["CODE"]
+
+
+async def test_late_duplicate_gets_cached_failure(exchange_calls: list[str]) -> None:
+    code_exchange = CodeExchange(ttl=10)
+
+    for _ in range(2):
+        with pytest.raises(OAuthFlowError, match="invalid_grant"):
+            await code_exchange.exchange("BAD_CODE", *CALLBACK[1:])
+
+    assert exchange_calls == ["BAD_CODE"]
+
+
+async def test_outage_is_not_cached(
+    exchange_calls: list[str], google_user: GoogleUser
+) -> None:
+    code_exchange = CodeExchange(ttl=10)
+
+    with pytest.raises(GoogleUnavailableError):
+        await code_exchange.exchange("DOWN_CODE", *CALLBACK[1:])
+
+    assert await code_exchange.exchange("DOWN_CODE", *CALLBACK[1:]) == google_user
+    assert exchange_calls == ["DOWN_CODE"] * 2
+
+
+async def test_expired_exchange_is_repeated(exchange_calls: list[str]) -> None:
+    code_exchange = CodeExchange(ttl=0)
+
+    await code_exchange.exchange(*CALLBACK)
+    await asyncio.sleep(0.001)
+    with pytest.raises(OAuthFlowError, match="invalid_grant"):
+        await code_exchange.exchange(*CALLBACK)
+
+    assert exchange_calls == ["CODE", "CODE"]
+    assert len(code_exchange.tasks) == 1
+
+
+async def test_other_client_cannot_replay_exchange(
+    exchange_calls: list[str], google_user: GoogleUser
+) -> None:
+    code_exchange = CodeExchange(ttl=10)
+    code, state, client = CALLBACK
+
+    assert await code_exchange.exchange(*CALLBACK) == google_user
+    with pytest.raises(OAuthFlowError, match="invalid_grant"):
+        await code_exchange.exchange(code, state, "203.0.113.7")
+    with pytest.raises(OAuthFlowError, match="invalid_grant"):
+        await code_exchange.exchange(code, "OTHER_STATE", client)
+
+    assert exchange_calls == [code] * 3
+
+
+async def test_cancelled_waiter_does_not_cancel_exchange(
+    exchange_calls: list[str], google_user: GoogleUser
+) -> None:
+    code_exchange = CodeExchange(ttl=10)
+
+    waiter = asyncio.create_task(code_exchange.exchange(*CALLBACK))
+    await asyncio.sleep(0)
+    waiter.cancel()
+
+    assert await code_exchange.exchange(*CALLBACK) == google_user
+    assert exchange_calls == ["CODE"]
+
+
+@pytest.mark.parametrize(
+    "upstream",
+    [Response(status.HTTP_502_BAD_GATEWAY), httpx.ConnectTimeout("timed out")],
+)
+async def test_google_outage_is_counted_by_breaker(
+    respx_mock: Router,
+    google_breaker: CircuitBreaker,
+    upstream: Response | Exception,
+) -> None:
+    respx_mock.post(google_oauth.TOKEN_URL).mock(side_effect=[upstream])
+
+    with pytest.raises(GoogleUnavailableError):
+        await google_oauth.exchange_code("CODE")
+
+    [(_, failed, _)] = google_breaker.outcomes
+    assert failed
+
+
+async def test_rejected_code_is_not_an_outage(
+    respx_mock: Router, google_breaker: CircuitBreaker
+) -> None:
+    respx_mock.post(google_oauth.TOKEN_URL).mock(
+        return_value=Response(status.HTTP_400_BAD_REQUEST)
+    )
+
+    with pytest.raises(OAuthFlowError) as exc_info:
+        await google_oauth.exchange_code("CODE")
+
+    assert not isinstance(exc_info.value, GoogleUnavailableError)
+    [(_, failed, _)] = google_breaker.outcomes
+    assert not failed
+
+
+def test_cert_fetch_failure_is_an_outage(monkeypatch: pytest.MonkeyPatch) -> None:
+    def unreachable(*_: Any) -> None:
+        raise TransportError("Could not fetch certificates")  # type: ignore[no-untyped-call]
+
+    monkeypatch.setattr(
+        google_oauth.google_id_token,  # type: ignore[attr-defined]
+        "verify_oauth2_token",
+        unreachable,
+    )
+
+    with pytest.raises(GoogleUnavailableError):
+        google_oauth.verify_id_token("TOKEN")
+
+
+def test_google_requests_have_a_timeout() -> None:
+    session = Mock()
+    request = google_oauth.TimeoutRequest(session)
+
+    request("https://www.googleapis.com/oauth2/v1/certs")
+
+    _, kwargs = session.request.call_args
+    assert kwargs["timeout"] == settings.google_timeout_seconds
+
+
+async def test_open_circuit_fails_fast(google_breaker: CircuitBreaker) -> None:
+    google_breaker.opened_at = time.monotonic()
+    rejections = google_oauth.google_circuit_rejections.value
+
+    with pytest.raises(GoogleUnavailableError, match="Google is unavailable"):
+        await google_oauth.exchange_code("CODE")
+
+    assert google_oauth.google_circuit_rejections.value == rejections + 1
+    assert "google_circuit_state 2" in render_metrics()
@@ -0,0 +1,378 @@
+import asyncio
+import contextlib
+import logging
+import uuid
+from collections.abc import AsyncGenerator, AsyncIterator
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from src.auth import partitions
+from src.core.config import settings
+from src.core.db import engine as app_engine
+from src.jobs import tasks, worker
+from src.jobs.models import Job, JobStatus
+from src.jobs.repo import JobRepo
+from src.jobs.worker import JobWorker
+from src.stats import rollups
+
+RETRY_BASE = 0.01
+POLL_INTERVAL = 0.02
+WAIT_TIMEOUT = 5
+TWO_ATTEMPTS = 2
+SHORT_LEASE = 0.06
+LONG_JOB = 0.3
+
+
+@pytest.fixture(autouse=True)
+async def clean_jobs(engine: AsyncEngine) -> AsyncGenerator[None]:
+    yield
+    async with engine.begin() as conn:
+        await conn.execute(delete(Job))
+
+
+@pytest.fixture
+def calls(monkeypatch: pytest.MonkeyPatch) -> list[dict[str, Any]]:
+    calls: list[dict[str, Any]] = []
+
+    async def record(payload: dict[str, Any]) -> None:
+        calls.append(payload)
+
+    async def flaky(payload: dict[str, Any]) -> None:
+        calls.append(payload)
+        if len(calls) == 1:
+            raise RuntimeError("flaky")
+
+    async def broken(_: dict[str, Any]) -> None:
+        raise RuntimeError("broken")
+
+    async def slow(payload: dict[str, Any]) -> None:
+        calls.append(payload)
+        await asyncio.Event().wait()
+
+    async def long(payload: dict[str, Any]) -> None:
+        calls.append(payload)
+        await asyncio.sleep(LONG_JOB)
+
+    for kind, handler in [
+        ("test.record", record),
+        ("test.flaky", flaky),
+        ("test.broken", broken),
+        ("test.slow", slow),
+        ("test.long", long),
+    ]:
+        monkeypatch.setitem(tasks.handlers, kind, handler)
+    monkeypatch.setattr(settings, "jobs_retry_base_seconds", RETRY_BASE)
+    return calls
+
+
+@contextlib.asynccontextmanager
+async def running(
+    job_worker: JobWorker, shutdown_timeout: float = 1
+) -> AsyncIterator[None]:
+    task = asyncio.create_task(job_worker.run(shutdown_timeout))
+    try:
+        yield
+    finally:
+        job_worker.stop()
+        await task
+
+
+async def enqueue(
+    engine: AsyncEngine, kind: str, payload: dict[str, Any], max_attempts: int = 3
+) -> uuid.UUID:
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        job = await JobRepo(session).enqueue(kind, payload, max_attempts)
+    return job.id
+
+
+async def wait_for(engine: AsyncEngine, id: uuid.UUID, *statuses: JobStatus) -> Job:
+    async with asyncio.timeout(WAIT_TIMEOUT):
+        while True:
+            async with AsyncSession(engine) as session:
+                job = await session.get(Job, id)
+            if job is not None and job.status in statuses:
+                return job
+            await asyncio.sleep(POLL_INTERVAL)
+
+
+async def test_notify_wakes_idle_worker(
+    engine: AsyncEngine, calls: list[dict[str, Any]]
+) -> None:
+    # Without a NOTIFY, the job would wait for the next poll in a minute
+    job_worker = JobWorker(engine, concurrency=2, poll_interval=60)
+    async with running(job_worker):
+        await asyncio.sleep(POLL_INTERVAL)
+        id = await enqueue(engine, "test.record", {"n": 1})
+        job = await wait_for(engine, id, JobStatus.succeeded)
+
+    assert calls == [{"n": 1}]
+    assert job.attempts == 1
+    assert job.finished_at is not None
+    assert job.locked_until is None
+
+
+async def test_failed_job_is_retried(
+    engine: AsyncEngine, calls: list[dict[str, Any]]
+) -> None:
+    async with running(JobWorker(engine, 1, POLL_INTERVAL)):
+        id = await enqueue(engine, "test.flaky", {})
+        job = await wait_for(engine, id, JobStatus.succeeded)
+
+    assert len(calls) == TWO_ATTEMPTS
+    assert job.attempts == TWO_ATTEMPTS
+    assert job.last_error is None
+
+
+async def test_job_fails_after_max_attempts(
+    engine: AsyncEngine, calls: list[dict[str, Any]]
+) -> None:
+    async with running(JobWorker(engine, 1, POLL_INTERVAL)):
+        id = await enqueue(engine, "test.broken", {}, TWO_ATTEMPTS)
+        job = await wait_for(engine, id, JobStatus.failed)
+
+    assert job.attempts == TWO_ATTEMPTS
+    assert job.last_error == "RuntimeError('broken')"
+    assert not calls
+
+
+async def test_job_without_handler_fails_at_once(engine: AsyncEngine) -> None:
+    async with running(JobWorker(engine, 1, POLL_INTERVAL)):
+        id = await enqueue(engine, "test.missing", {})
+        job = await wait_for(engine, id, JobStatus.failed)
+
+    assert job.attempts == 1
+    assert job.last_error is not None
+    assert "No handler" in job.last_error
+
+
+async def test_shutdown_requeues_running_jobs(
+    engine: AsyncEngine, calls: list[dict[str, Any]]
+) -> None:
+    async with running(JobWorker(engine, 1, POLL_INTERVAL), shutdown_timeout=0):
+        id = await enqueue(engine, "test.slow", {})
+        await wait_for(engine, id, JobStatus.running)
+
+    job = await wait_for(engine, id, JobStatus.queued)
+    assert job.attempts == 0
+    assert calls == [{}]
+
+
+async def test_lease_is_renewed_while_running(
+    monkeypatch: pytest.MonkeyPatch,
+    engine: AsyncEngine,
+    calls: list[dict[str, Any]],
+) -> None:
+    monkeypatch.setattr(settings, "jobs_lease_seconds", SHORT_LEASE)
+
+    async with running(JobWorker(engine, 1, POLL_INTERVAL)):
+        id = await enqueue(engine, "test.long", {})
+        job = await wait_for(engine, id, JobStatus.succeeded)
+
+    assert job.attempts == 1
+    assert job.last_error is None
+    assert calls == [{}]
+
+
+async def test_lost_claim_leaves_the_new_owner_alone(session: AsyncSession) -> None:
+    repo = JobRepo(session)
+    session.add(Job(kind="test.record", max_attempts=3))
+    await session.flush()
+    first = await repo.claim(lease=-1)
+    assert first is not None
+    lost = Job(id=first.id, attempts=first.attempts)
+    await repo.reap()
+    second = await repo.claim(lease=60)
+    assert second is not None
+
+    assert not await repo.renew(lost, 60)
+    assert not await repo.finish(lost, "late")
+    await repo.release(lost)
+
+    await session.refresh(second)
+    assert second.status == JobStatus.running
+    assert second.attempts == TWO_ATTEMPTS
+    assert second.finished_at is None
+    assert await repo.renew(second, 60)
+
+
+async def test_outcome_of_lost_claim_is_discarded(
+    monkeypatch: pytest.MonkeyPatch,
+    engine: AsyncEngine,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    async def stolen(_: dict[str, Any]) -> None:
+        # Reaped and claimed by another worker while this one still runs it
+        async with engine.begin() as conn:
+            await conn.execute(update(Job).values(attempts=Job.attempts + 1))
+
+    monkeypatch.setitem(tasks.handlers, "test.stolen", stolen)
+    id = await enqueue(engine, "test.stolen", {})
+
+    job_worker = JobWorker(engine, 1, POLL_INTERVAL)
+    job = await job_worker.claim()
+    assert job is not None
+    with caplog.at_level(logging.WARNING):
+        await job_worker.execute(job)
+
+    assert "lost its lease; outcome discarded" in caplog.text
+    job = await wait_for(engine, id, JobStatus.running)
+    assert job.finished_at is None
+
+
+async def test_renewal_stops_once_the_lease_is_lost(
+    monkeypatch: pytest.MonkeyPatch,
+    engine: AsyncEngine,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    outcomes: list[Exception | bool] = [OSError("connection lost"), False]
+
+    async def renew(*_: Any) -> bool:
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(JobRepo, "renew", renew)
+    monkeypatch.setattr(settings, "jobs_lease_seconds", SHORT_LEASE)
+    job = Job(id=uuid.uuid4(), kind="test.record", attempts=1)
+
+    with caplog.at_level(logging.WARNING):
+        await JobWorker(engine, 1, POLL_INTERVAL).renew(job)
+
+    assert "Renewing the lease of job" in caplog.text
+    assert "lost its lease" in caplog.text
+    assert not outcomes
+
+
+def test_backoff_is_exponential_capped_and_jittered(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    base, cap = 10, 60
+    monkeypatch.setattr(settings, "jobs_retry_base_seconds", base)
+    monkeypatch.setattr(settings, "jobs_retry_max_seconds", cap)
+
+    assert base / 2 <= worker.backoff(1) <= base
+    assert base * 2 <= worker.backoff(3) <= base * 4
+    assert cap / 2 <= worker.backoff(10) <= cap
+
+
+async def test_expired_leases_are_reaped(session: AsyncSession) -> None:
+    expired = datetime.now(UTC) - timedelta(minutes=1)
+    lost = Job(kind="test.record", max_attempts=TWO_ATTEMPTS, attempts=1)
+    exhausted = Job(kind="test.record", max_attempts=TWO_ATTEMPTS, attempts=2)
+    alive = Job(kind="test.record", max_attempts=TWO_ATTEMPTS, attempts=1)
+    for job, locked_until in [
+        (lost, expired),
+        (exhausted, expired),
+        (alive, datetime.now(UTC) + timedelta(minutes=1)),
+    ]:
+        job.status, job.locked_until = JobStatus.running, locked_until
+        session.add(job)
+    await session.flush()
+
+    assert await JobRepo(session).reap() == len([lost, exhausted])
+
+    for job in (lost, exhausted, alive):
+        await session.refresh(job)
+    assert lost.status == JobStatus.queued
+    assert exhausted.status == JobStatus.failed
+    assert exhausted.finished_at is not None
+    assert alive.status == JobStatus.running
+
+
+async def test_worker_reaps_lost_jobs(
+    engine: AsyncEngine,
+    calls: list[dict[str, Any]],
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    id = await enqueue(engine, "test.record", {})
+    async with engine.begin() as conn:
+        await conn.execute(
+            update(Job).values(
+                status=JobStatus.running,
+                locked_until=datetime.now(UTC) - timedelta(minutes=1),
+            )
+        )
+
+    with caplog.at_level(logging.WARNING):
+        async with running(JobWorker(engine, 1, POLL_INTERVAL)):
+            await wait_for(engine, id, JobStatus.queued, JobStatus.succeeded)
+
+    assert "Reaped 1 jobs with expired leases" in caplog.text
+    assert len(calls) <= 1
+
+
+async def test_database_errors_keep_the_worker_running(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    broken = create_async_engine("postgresql+asyncpg://nobody@127.0.0.1:1/none")
+    job_worker = JobWorker(broken, concurrency=1, poll_interval=POLL_INTERVAL)
+
+    with caplog.at_level(logging.ERROR):
+        tasks_ = [
+            asyncio.create_task(job_worker.slot()),
+            asyncio.create_task(job_worker.reap()),
+        ]
+        await asyncio.sleep(POLL_INTERVAL * 3)
+        job_worker.stop()
+        await asyncio.gather(*tasks_)
+
+    assert "Claiming or finishing a job failed" in caplog.text
+    assert "Reaping jobs failed" in caplog.text
+    await broken.dispose()
+
+
+async def test_registered_jobs(monkeypatch: pytest.MonkeyPatch) -> None:
+    ran = []
+
+    async def fake(db_engine: AsyncEngine) -> None:
+        ran.append(db_engine)
+
+    monkeypatch.setattr(rollups, "backfill", fake)
+    monkeypatch.setattr(partitions, "maintain_current_partitions", fake)
+
+    await tasks.handlers["stats.backfill"]({})
+    await tasks.handlers["auth_events.partitions"]({})
+
+    assert ran == [app_engine, app_engine]
+
+
+async def test_admin_queues_and_reads_jobs(admin_client: AsyncClient) -> None:
+    response = await admin_client.post(
+        "/admin/jobs", json={"kind": "stats.backfill", "max_attempts": 1}
+    )
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    job = response.json()
+    assert job["status"] == JobStatus.queued
+    assert job["max_attempts"] == 1
+
+    response = await admin_client.get(f"/admin/jobs/{job['id']}")
+    assert response.json() == job
+
+    response = await admin_client.get("/admin/jobs", params={"status": "queued"})
+    assert [j["id"] for j in response.json()] == [job["id"]]
+
+    response = await admin_client.get("/admin/jobs", params={"status": "failed"})
+    assert response.json() == []
+
+
+async def test_unknown_job_kind_is_rejected(admin_client: AsyncClient) -> None:
+    response = await admin_client.post("/admin/jobs", json={"kind": "nope"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+async def test_missing_job(admin_client: AsyncClient) -> None:
+    response = await admin_client.get(f"/admin/jobs/{uuid.uuid4()}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_jobs_need_an_admin(auth_client: AsyncClient) -> None:
+    response = await auth_client.get("/admin/jobs")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
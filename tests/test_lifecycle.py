@@ -0,0 +1,69 @@
+import logging
+
+import pytest
+
+from src.core.lifecycle import Lifecycle
+
+
+async def test_shutdown_steps_run_in_order_and_are_timed(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    lifecycle = Lifecycle()
+    ran = []
+
+    async def flush() -> None:
+        ran.append("flush")
+
+    async def close() -> None:
+        ran.append("close")
+
+    with caplog.at_level(logging.INFO):
+        await lifecycle.shut_down([("queue flush", flush), ("HTTP pool", close)])
+
+    assert ran == ["flush", "close"]
+    assert lifecycle.draining
+    assert "Shutdown: readiness off" in caplog.text
+    assert "Shutdown: queue flush took" in caplog.text
+    assert "Shutdown: HTTP pool took" in caplog.text
+    assert "Shutdown: completed in" in caplog.text
+
+
+async def test_failed_step_does_not_stop_the_rest(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    lifecycle = Lifecycle()
+    ran = []
+
+    async def broken() -> None:
+        raise RuntimeError("flush failed")
+
+    async def dispose() -> None:
+        ran.append("dispose")
+
+    with caplog.at_level(logging.INFO):
+        await lifecycle.shut_down([("queue flush", broken), ("database", dispose)])
+
+    assert ran == ["dispose"]
+    assert "Shutdown: queue flush failed" in caplog.text
+
+
+async def test_drain_and_in_flight_are_timed(caplog: pytest.LogCaptureFixture) -> None:
+    lifecycle = Lifecycle()
+
+    with caplog.at_level(logging.INFO):
+        lifecycle.drain()
+        lifecycle.drain()
+        lifecycle.close()
+        await lifecycle.shut_down([])
+
+    assert caplog.text.count("Shutdown: readiness off") == 1
+    assert "Shutdown: load balancer drain took" in caplog.text
+    assert "Shutdown: in-flight requests took" in caplog.text
+
+
+def test_closing_without_drain() -> None:
+    lifecycle = Lifecycle()
+
+    lifecycle.close()
+
+    assert lifecycle.draining_since == lifecycle.closed_at
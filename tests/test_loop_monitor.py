@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import time
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from src.auth import google_oauth
+from src.core import loop_monitor
+from src.core.loop_monitor import LoopMonitor
+
+BLOCK_SECONDS = 0.2
+
+
+@pytest.fixture
+async def monitor() -> AsyncGenerator[LoopMonitor]:
+    monitor = LoopMonitor(interval=0.01, block_threshold=0.05)
+    await monitor.start()
+    yield monitor
+    await monitor.stop()
+
+
+@pytest.fixture
+def blocking_verify(
+    monkeypatch: pytest.MonkeyPatch, google_id_token_payload: dict[str, Any]
+) -> None:
+    def slow_verify(*_: Any) -> dict[str, Any]:
+        time.sleep(BLOCK_SECONDS)
+        return google_id_token_payload
+
+    monkeypatch.setattr(
+        google_oauth.google_id_token,  # type: ignore[attr-defined]
+        "verify_oauth2_token",
+        slow_verify,
+    )
+
+
+@pytest.mark.usefixtures("monitor", "blocking_verify")
+async def test_blocking_call_is_measured_and_reported(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    count = loop_monitor.loop_lag.count
+    await asyncio.sleep(0.02)
+
+    with caplog.at_level(logging.WARNING, logger=loop_monitor.__name__):
+        google_oauth.verify_id_token("TOKEN")
+        await asyncio.sleep(0.05)
+
+    assert loop_monitor.loop_lag.count > count
+    [record] = [r for r in caplog.records if "Event loop blocked" in r.message]
+    assert "src/auth/google_oauth.py" in record.message
+    assert "in verify_id_token" in record.message
+
+
+def test_culprit_outside_project() -> None:
+    frame = loop_monitor.sys._getframe()  # type: ignore[attr-defined]
+    assert loop_monitor.culprit(frame) is None
+
+
+async def test_metrics_endpoint(client: AsyncClient, api_key: dict[str, Any]) -> None:
+    response = await client.get(
+        "http://test/metrics", headers={"X-API-Key": api_key["key"]}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert 'event_loop_lag_seconds_bucket{le="+Inf"}' in response.text
+
+
+async def test_metrics_endpoint_requires_api_key(client: AsyncClient) -> None:
+    response = await client.get("http://test/metrics")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
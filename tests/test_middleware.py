@@ -0,0 +1,87 @@
+from collections.abc import AsyncGenerator
+
+import pytest
+from fastapi import FastAPI, status
+from httpx import ASGITransport, AsyncClient
+
+from src.core.middleware import CORSMiddleware
+
+ORIGINS = ["https://example.com", "https://*.example.com"]
+MAX_AGE = 7200
+
+
+@pytest.fixture
+async def cors_client() -> AsyncGenerator[AsyncClient]:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping() -> dict[str, str]:
+        return {"ping": "pong"}
+
+    app.add_middleware(CORSMiddleware, allow_origins=ORIGINS, max_age=MAX_AGE)
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as c:
+        yield c
+
+
+def preflight_headers(origin: str) -> dict[str, str]:
+    return {
+        "Origin": origin,
+        "Access-Control-Request-Method": "POST",
+        "Access-Control-Request-Headers": "content-type",
+    }
+
+
+@pytest.mark.parametrize("origin", ["https://example.com", "https://www.example.com"])
+async def test_preflight_allowed(cors_client: AsyncClient, origin: str) -> None:
+    response = await cors_client.options("/ping", headers=preflight_headers(origin))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["access-control-allow-origin"] == origin
+    assert response.headers["access-control-allow-credentials"] == "true"
+    assert response.headers["access-control-allow-headers"] == "content-type"
+    assert response.headers["access-control-max-age"] == str(MAX_AGE)
+
+
+@pytest.mark.parametrize(
+    "origin",
+    ["https://evil.com", "https://example.com.evil.com", "https://a.b.example.com"],
+)
+async def test_preflight_disallowed(cors_client: AsyncClient, origin: str) -> None:
+    response = await cors_client.options("/ping", headers=preflight_headers(origin))
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "access-control-allow-origin" not in response.headers
+
+
+async def test_simple_request_allowed(cors_client: AsyncClient) -> None:
+    origin = "https://api.example.com"
+    response = await cors_client.get("/ping", headers={"Origin": origin})
+
+    assert response.json() == {"ping": "pong"}
+    assert response.headers["access-control-allow-origin"] == origin
+    assert response.headers["access-control-allow-credentials"] == "true"
+    assert response.headers["vary"] == "Origin"
+
+
+async def test_simple_request_disallowed(cors_client: AsyncClient) -> None:
+    response = await cors_client.get("/ping", headers={"Origin": "https://evil.com"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "access-control-allow-origin" not in response.headers
+
+
+async def test_request_without_origin(cors_client: AsyncClient) -> None:
+    response = await cors_client.get("/ping")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "access-control-allow-origin" not in response.headers
+
+
+async def test_wildcard_origin(client: AsyncClient) -> None:
+    origin = "https://anything.test"
+    response = await client.get("/users/me", headers={"Origin": origin})
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.headers["access-control-allow-origin"] == origin
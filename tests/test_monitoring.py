@@ -0,0 +1,48 @@
+from typing import Any
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.lifecycle import lifecycle
+
+READY_URL = "http://test/health/ready"
+
+
+async def test_ready(client: AsyncClient) -> None:
+    response = await client.get(READY_URL)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "draining": False,
+        "database": True,
+        "google": "closed",
+    }
+
+
+async def test_not_ready_without_database(
+    monkeypatch: pytest.MonkeyPatch, client: AsyncClient, session: AsyncSession
+) -> None:
+    async def unreachable(*_: Any) -> None:
+        raise OperationalError("SELECT 1", None, ConnectionRefusedError())
+
+    monkeypatch.setattr(session, "execute", unreachable)
+
+    response = await client.get(READY_URL)
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json()["database"] is False
+
+
+async def test_not_ready_while_draining(
+    monkeypatch: pytest.MonkeyPatch, client: AsyncClient
+) -> None:
+    monkeypatch.setattr(lifecycle, "draining_since", 0.0)
+
+    response = await client.get(READY_URL)
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json()["draining"] is True
+    assert response.json()["database"] is True
@@ -0,0 +1,216 @@
+import asyncio
+import time
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+from fastapi import FastAPI, status
+from httpx import ASGITransport, AsyncClient
+
+from src.core.config import settings
+from src.core.middleware import ProfilingMiddleware
+from src.profiling import profiler
+from src.profiling.profiler import Profile, Sampler
+
+TOKEN = "profile-me"
+
+
+def busy_wait(seconds: float) -> None:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+@pytest.fixture
+def sampler(monkeypatch: pytest.MonkeyPatch) -> Sampler:
+    sampler = Sampler(interval=0.001, continuous_interval=None)
+    monkeypatch.setattr(profiler, "sampler", sampler)
+    monkeypatch.setattr("src.core.middleware.sampler", sampler)
+    monkeypatch.setattr("src.profiling.router.sampler", sampler)
+    monkeypatch.setattr(settings, "profiling_token", TOKEN)
+    return sampler
+
+
+@pytest.fixture
+async def profiled_client(sampler: Sampler) -> AsyncGenerator[AsyncClient]:
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work() -> dict[str, str]:
+        await asyncio.sleep(0.05)
+        busy_wait(0.05)
+        return {}
+
+    app.add_middleware(ProfilingMiddleware)
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as c:
+        yield c
+    await sampler.close()
+
+
+async def test_profile_with_token(
+    profiled_client: AsyncClient, sampler: Sampler
+) -> None:
+    response = await profiled_client.get("/work", headers={"X-Profile": TOKEN})
+
+    profile = sampler.get(int(response.headers["x-profile-id"]))
+    assert profile is not None
+    assert profile.name == "GET /work"
+    assert profile.duration is not None
+    collapsed = profile.to_collapsed()
+    assert "busy_wait (tests/test_profiling.py" in collapsed
+    assert "[await]" in collapsed
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Profile": "wrong"}])
+async def test_not_profiled(
+    profiled_client: AsyncClient, sampler: Sampler, headers: dict[str, str]
+) -> None:
+    response = await profiled_client.get("/work", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "x-profile-id" not in response.headers
+    assert not sampler.finished
+
+
+async def test_profile_armed_requests(
+    monkeypatch: pytest.MonkeyPatch, profiled_client: AsyncClient
+) -> None:
+    monkeypatch.setattr(profiler.trigger, "remaining", 0)
+    profiler.trigger.arm(requests=1, path_prefix="/work")
+
+    first = await profiled_client.get("/work")
+    second = await profiled_client.get("/work")
+
+    assert "x-profile-id" in first.headers
+    assert "x-profile-id" not in second.headers
+
+
+async def test_continuous_sampling() -> None:
+    sampler = Sampler(interval=0.001, continuous_interval=0.002)
+    assert sampler.continuous is not None
+
+    sampler.ensure_running()
+    busy_wait(0.02)
+    await asyncio.sleep(0.02)
+    await sampler.close()
+
+    assert sampler.continuous.samples > 0
+    assert "busy_wait" in sampler.continuous.to_collapsed()
+
+
+def test_profile_bounded_stacks(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(profiler, "MAX_STACKS", 2)
+    profile = Profile("test", interval=0.001)
+
+    for name in "abcd":
+        profile.add([name])
+
+    assert profile.stacks == {("a",): 1, ("b",): 1, profiler.TRUNCATED: 2}
+
+
+async def test_render_continuous_profile_while_sampling() -> None:
+    sampler = Sampler(interval=0.001, continuous_interval=0.0001)
+    assert sampler.continuous is not None
+    sampler.ensure_running()
+
+    deadline = time.monotonic() + 0.05
+    while time.monotonic() < deadline:
+        snapshot = sampler.snapshot(sampler.continuous)
+        snapshot.to_speedscope()
+        await asyncio.sleep(0)
+    await sampler.close()
+
+    assert snapshot.id == sampler.continuous.id
+    assert snapshot.stacks is not sampler.continuous.stacks
+
+
+@pytest.fixture
+def finished_profile(sampler: Sampler) -> Profile:
+    profile = Profile("GET /v1/auth/google/callback", interval=0.001)
+    profile.add(["finish_google_oauth", "exchange"])
+    profile.add(["finish_google_oauth", "exchange"])
+    profile.add(["finish_google_oauth", "update_or_create_google_user"])
+    profile.finish()
+    sampler.finished.append(profile)
+    return profile
+
+
+async def test_list_profiles(
+    admin_client: AsyncClient, finished_profile: Profile
+) -> None:
+    response = await admin_client.get("/admin/profiling")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()[0]["id"] == finished_profile.id
+    assert response.json()[0]["samples"] == finished_profile.samples
+
+
+async def test_read_profile_speedscope(
+    admin_client: AsyncClient, finished_profile: Profile
+) -> None:
+    response = await admin_client.get(f"/admin/profiling/{finished_profile.id}")
+
+    data: dict[str, Any] = response.json()
+    frames = [frame["name"] for frame in data["shared"]["frames"]]
+    [speedscope_profile] = data["profiles"]
+    assert frames == ["finish_google_oauth", "exchange", "update_or_create_google_user"]
+    assert speedscope_profile["samples"] == [[0, 1], [0, 2]]
+    assert speedscope_profile["weights"] == [0.002, 0.001]
+
+
+async def test_read_profile_collapsed(
+    admin_client: AsyncClient, finished_profile: Profile
+) -> None:
+    response = await admin_client.get(
+        f"/admin/profiling/{finished_profile.id}", params={"format": "collapsed"}
+    )
+
+    assert response.text == (
+        "finish_google_oauth;exchange 2\n"
+        "finish_google_oauth;update_or_create_google_user 1\n"
+    )
+
+
+@pytest.mark.usefixtures("sampler")
+async def test_read_profile_not_found(admin_client: AsyncClient) -> None:
+    response = await admin_client.get("/admin/profiling/0")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = await admin_client.get("/admin/profiling/continuous")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_read_continuous_profile(
+    monkeypatch: pytest.MonkeyPatch, admin_client: AsyncClient, sampler: Sampler
+) -> None:
+    continuous = Profile("continuous", interval=0.02)
+    continuous.add(["run", "select"])
+    monkeypatch.setattr(sampler, "continuous", continuous)
+
+    response = await admin_client.get(
+        "/admin/profiling/continuous", params={"format": "collapsed"}
+    )
+
+    assert response.text == "run;select 1\n"
+
+
+async def test_arm_profiling(
+    monkeypatch: pytest.MonkeyPatch, admin_client: AsyncClient
+) -> None:
+    monkeypatch.setattr(profiler.trigger, "remaining", 0)
+    data = {"requests": 3, "path_prefix": "/v1/auth"}
+
+    response = await admin_client.post("/admin/profiling/arm", json=data)
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    monkeypatch.setattr(settings, "profiling_enabled", True)
+    response = await admin_client.post("/admin/profiling/arm", json=data)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert profiler.trigger.remaining == data["requests"]
+
+
+async def test_profiling_requires_admin(auth_client: AsyncClient) -> None:
+    response = await auth_client.get("/admin/profiling")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import logging
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+from fastapi import FastAPI, status
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core import query_stats
+from src.core.config import EnvEnum, settings
+from src.core.middleware import QueryStatsMiddleware
+from src.users.models import User
+
+
+@pytest.fixture
+async def stats_client(engine: AsyncEngine) -> AsyncGenerator[AsyncClient]:
+    app = FastAPI()
+
+    @app.get("/users/{count}")
+    async def read_users(count: int) -> dict[str, str]:
+        async with engine.connect() as conn:
+            for _ in range(count):
+                await conn.execute(select(User).where(User.email == "x@example.com"))
+        return {}
+
+    app.add_middleware(QueryStatsMiddleware)
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as c:
+        yield c
+
+
+def slow_query_logs(caplog: pytest.LogCaptureFixture) -> list[dict[str, Any]]:
+    return [
+        json.loads(r.message)
+        for r in caplog.records
+        if r.name == query_stats.__name__ and "slow_query" in r.message
+    ]
+
+
+async def test_server_timing(auth_client: AsyncClient) -> None:
+    response = await auth_client.get("/users/me")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert response.headers["server-timing"].endswith('desc="1 queries"')
+
+
+async def test_no_server_timing_in_production(
+    monkeypatch: pytest.MonkeyPatch, auth_client: AsyncClient
+) -> None:
+    monkeypatch.setattr(settings, "environment", EnvEnum.production)
+
+    response = await auth_client.get("/users/me")
+
+    assert "server-timing" not in response.headers
+
+
+async def test_n_plus_one_logged(
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+    stats_client: AsyncClient,
+) -> None:
+    monkeypatch.setattr(settings, "n_plus_one_threshold", 3)
+
+    with caplog.at_level(logging.WARNING):
+        response = await stats_client.get("/users/2")
+        assert not [r for r in caplog.records if "N+1" in r.message]
+
+        response = await stats_client.get("/users/3")
+
+    assert response.headers["server-timing"].endswith('desc="3 queries"')
+    [record] = [r for r in caplog.records if "N+1" in r.message]
+    assert "GET /users/3: 3 executions of SELECT" in record.message
+
+
+async def test_slow_query_logged_with_redacted_parameters(
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+    engine: AsyncEngine,
+) -> None:
+    monkeypatch.setattr(settings, "slow_query_ms", 0)
+    monkeypatch.setattr(settings, "slow_query_explain_rate", 0)
+
+    with caplog.at_level(logging.WARNING):
+        async with engine.connect() as conn:
+            await conn.execute(
+                select(User).where(User.email == "secret@example.com", User.is_admin)
+            )
+
+    [entry] = slow_query_logs(caplog)
+    assert entry["statement"].startswith("SELECT users.id")
+    assert entry["parameters"] == ["<str>"]
+    assert "plan" not in entry
+    assert "secret@example.com" not in caplog.text
+
+
+async def test_slow_query_explained(
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+    engine: AsyncEngine,
+) -> None:
+    monkeypatch.setattr(settings, "slow_query_ms", 0)
+    monkeypatch.setattr(settings, "slow_query_explain_rate", 1)
+
+    with caplog.at_level(logging.WARNING):
+        async with engine.connect() as conn:
+            await conn.execute(select(User).where(User.email == "x@example.com"))
+        await asyncio.gather(*query_stats.background_tasks)
+
+    [entry] = slow_query_logs(caplog)
+    [plan] = entry["plan"]
+    assert plan["Plan"]["Relation Name"] == "users"
+    assert "Shared Hit Blocks" in plan["Plan"]
+
+
+async def test_slow_query_explain_failure_is_logged(
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+    engine: AsyncEngine,
+) -> None:
+    monkeypatch.setattr(settings, "slow_query_ms", 0)
+    monkeypatch.setattr(settings, "slow_query_explain_rate", 1)
+    monkeypatch.setattr(query_stats, "EXPLAIN_ANALYZE", "EXPLAIN (UNKNOWN) ")
+
+    with caplog.at_level(logging.WARNING):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        await asyncio.gather(*query_stats.background_tasks)
+
+    [entry] = slow_query_logs(caplog)
+    assert "plan" not in entry
+    assert "unrecognized EXPLAIN option" in entry["plan_error"]
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "SELECT pg_notify('query_stats', 'x')",
+        "SELECT pg_advisory_xact_lock(1)",
+        "SELECT users.id FROM users FOR UPDATE SKIP LOCKED",
+        "UPDATE users SET is_admin = false WHERE false",
+    ],
+)
+async def test_statements_with_side_effects_are_not_run_by_explain(
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+    engine: AsyncEngine,
+    statement: str,
+) -> None:
+    monkeypatch.setattr(settings, "slow_query_ms", 0)
+    monkeypatch.setattr(settings, "slow_query_explain_rate", 1)
+
+    with caplog.at_level(logging.WARNING):
+        async with engine.begin() as conn:
+            await conn.execute(text(statement))
+        await asyncio.gather(*query_stats.background_tasks)
+
+    [plan] = next(e["plan"] for e in slow_query_logs(caplog) if "plan" in e)
+    assert "Actual Rows" not in plan["Plan"]
+
+
+async def test_explain_analyze_runs_read_only(
+    monkeypatch: pytest.MonkeyPatch, engine: AsyncEngine
+) -> None:
+    monkeypatch.setattr(
+        query_stats, "explain_prefix", lambda _: query_stats.EXPLAIN_ANALYZE
+    )
+    entry: dict[str, Any] = {}
+
+    await query_stats.explain_slow_query(
+        engine, "UPDATE users SET is_admin = false WHERE false", (), entry
+    )
+
+    assert "read-only transaction" in entry["plan_error"]
+
+
+async def test_failed_statement_clears_timer(engine: AsyncEngine) -> None:
+    async with engine.connect() as conn:
+        with pytest.raises(DBAPIError):
+            await conn.execute(text("SELECT 1 / 0"))
+
+        assert "query_start" not in conn.info
+
+
+def test_redact_executemany() -> None:
+    assert query_stats.redact([(1,), (2,)], executemany=True) == "<2 rows>"
+    assert query_stats.redact({"id": 1}, executemany=False) == {"id": "<int>"}
@@ -0,0 +1,127 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core import rate_limit
+from src.core.config import settings
+from src.core.models import RateLimitBucket
+
+INTERVAL, PERIOD = 1.0, 3.0
+BURST = int(PERIOD / INTERVAL)
+
+
+@pytest.fixture
+async def pg_backend(engine: AsyncEngine) -> rate_limit.PostgresBackend:
+    async with engine.begin() as conn:
+        await conn.execute(delete(RateLimitBucket))
+    return rate_limit.PostgresBackend(engine)
+
+
+async def test_memory_backend_burst_then_reject() -> None:
+    backend = rate_limit.MemoryBackend(max_keys=10)
+
+    for _ in range(BURST):
+        assert await backend.hit("a", INTERVAL, PERIOD) == 0
+    retry_after = await backend.hit("a", INTERVAL, PERIOD)
+
+    assert 0 < retry_after <= INTERVAL
+    assert await backend.hit("b", INTERVAL, PERIOD) == 0
+
+
+async def test_memory_backend_bounded_keys() -> None:
+    max_keys = 3
+    backend = rate_limit.MemoryBackend(max_keys=max_keys)
+
+    for i in range(10):
+        await backend.hit(str(i), INTERVAL, PERIOD)
+
+    assert len(backend.tats) <= max_keys
+    assert "9" in backend.tats
+
+
+async def test_memory_backend_evicts_refilled_keys_first() -> None:
+    backend = rate_limit.MemoryBackend(max_keys=2)
+    await backend.hit("expired", 0.0, PERIOD)
+    await backend.hit("active", INTERVAL, PERIOD)
+
+    await backend.hit("new", INTERVAL, PERIOD)
+
+    assert set(backend.tats) == {"active", "new"}
+
+
+async def test_memory_backend_evicts_least_recently_hit() -> None:
+    backend = rate_limit.MemoryBackend(max_keys=2)
+    await backend.hit("a", INTERVAL, PERIOD)
+    await backend.hit("b", INTERVAL, PERIOD)
+    await backend.hit("a", INTERVAL, PERIOD)
+
+    await backend.hit("c", INTERVAL, PERIOD)
+
+    assert list(backend.tats) == ["a", "c"]
+
+
+async def test_memory_backend_sweeps_refilled_keys() -> None:
+    backend = rate_limit.MemoryBackend(max_keys=3)
+    await backend.hit("active", INTERVAL, PERIOD)
+    await backend.hit("expired", 0.0, PERIOD)
+    await backend.hit("other", INTERVAL, PERIOD)
+    backend.evictions = backend.max_keys - 1
+
+    await backend.hit("new", INTERVAL, PERIOD)
+
+    assert list(backend.tats) == ["active", "other", "new"]
+
+
+async def test_postgres_backend_burst_then_reject(
+    pg_backend: rate_limit.PostgresBackend,
+) -> None:
+    for _ in range(BURST):
+        assert await pg_backend.hit("a", INTERVAL, PERIOD) == 0
+    retry_after = await pg_backend.hit("a", INTERVAL, PERIOD)
+
+    assert 0 < retry_after <= INTERVAL
+    assert await pg_backend.hit("b", INTERVAL, PERIOD) == 0
+
+
+async def test_postgres_backend_purges_refilled_keys(
+    pg_backend: rate_limit.PostgresBackend,
+) -> None:
+    pg_backend.purge_every = 2
+    await pg_backend.hit("expired", 0.0, PERIOD)
+    await pg_backend.hit("active", INTERVAL, PERIOD)
+
+    async with pg_backend.engine.connect() as conn:
+        keys = (await conn.scalars(select(RateLimitBucket.key))).all()
+
+    assert keys == ["active"]
+
+
+async def test_oauth_login_rate_limited(
+    monkeypatch: pytest.MonkeyPatch, client: AsyncClient
+) -> None:
+    monkeypatch.setattr(rate_limit.oauth_rate_limit, "interval", INTERVAL)
+    monkeypatch.setattr(rate_limit.oauth_rate_limit, "period", PERIOD)
+
+    for _ in range(BURST):
+        response = await client.get("/auth/google/login")
+        assert response.status_code == status.HTTP_303_SEE_OTHER
+
+    response = await client.get("/auth/google/login")
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.headers["retry-after"] == "1"
+
+    # Limits are tracked per route
+    response = await client.get("/auth/google/callback")
+    assert response.status_code == status.HTTP_303_SEE_OTHER
+
+
+async def test_rate_limit_disabled(
+    monkeypatch: pytest.MonkeyPatch, client: AsyncClient
+) -> None:
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    monkeypatch.setattr(rate_limit.oauth_rate_limit, "period", 0.0)
+
+    response = await client.get("/auth/google/login")
+    assert response.status_code == status.HTTP_303_SEE_OTHER
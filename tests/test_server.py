@@ -0,0 +1,327 @@
+import asyncio
+import contextlib
+import itertools
+import os
+import signal
+import socket
+import sys
+import uuid
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+import uvicorn
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src import server
+from src.core.config import settings
+from src.core.lifecycle import lifecycle
+from src.core.security import AUTH_COOKIE_NAME, create_access_token
+from src.users.models import User
+
+AFFINITY_CPUS = 8
+ROOT = Path(server.__file__).resolve().parent.parent
+DRAIN_DELAY = 0.5
+HEALTH_CHECK_INTERVAL = 0.05
+STARTUP_TIMEOUT = 30
+LOAD_WORKERS = 8
+ME_PATH = "/v1/users/me"
+
+
+@pytest.fixture
+def cpu_max(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    path = tmp_path / "cpu.max"
+    monkeypatch.setattr(server, "CGROUP_CPU_MAX", path)
+    monkeypatch.setattr(os, "sched_getaffinity", lambda _: set(range(AFFINITY_CPUS)))
+    return path
+
+
+def test_available_cpus_without_cgroup(cpu_max: Path) -> None:
+    assert not cpu_max.exists()
+    assert server.available_cpus() == AFFINITY_CPUS
+
+
+def test_available_cpus_unlimited_quota(cpu_max: Path) -> None:
+    cpu_max.write_text("max 100000\n")
+    assert server.available_cpus() == AFFINITY_CPUS
+
+
+@pytest.mark.parametrize(
+    ("quota", "expected"),
+    [("50000", 1), ("150000", 2), ("400000", 4), ("1600000", AFFINITY_CPUS)],
+)
+def test_available_cpus_cgroup_quota(cpu_max: Path, quota: str, expected: int) -> None:
+    cpu_max.write_text(f"{quota} 100000\n")
+    assert server.available_cpus() == expected
+
+
+@pytest.mark.usefixtures("cpu_max")
+def test_worker_count(monkeypatch: pytest.MonkeyPatch) -> None:
+    workers = 3
+
+    monkeypatch.setattr(settings, "server_workers", None)
+    assert server.worker_count() == AFFINITY_CPUS
+
+    monkeypatch.setattr(settings, "server_workers", workers)
+    assert server.worker_count() == workers
+
+    monkeypatch.setattr(settings, "server_reload", True)
+    assert server.worker_count() == 1
+
+
+def test_server_options(monkeypatch: pytest.MonkeyPatch) -> None:
+    workers, max_requests = 2, 10_000
+    monkeypatch.setattr(settings, "server_workers", workers)
+    monkeypatch.setattr(settings, "server_limit_max_requests", max_requests)
+
+    options = server.server_options()
+
+    assert options["workers"] == workers
+    assert options["loop"] == "uvloop"
+    assert options["http"] == "httptools"
+    assert options["limit_max_requests"] == max_requests
+    assert options["proxy_headers"] is True
+    assert options["forwarded_allow_ips"] is None  # uvicorn reads the env var
+
+
+def test_forwarded_allow_ips_from_environment(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("FORWARDED_ALLOW_IPS", "*")
+
+    config = uvicorn.Config(server.APP, **server.server_options())
+
+    assert config.forwarded_allow_ips == "*"
+
+
+async def test_each_worker_jitters_its_request_limit(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    max_requests = 10_000
+    limits: list[int] = []
+
+    async def serve(self: uvicorn.Server, _: Any = None) -> None:
+        assert self.config.limit_max_requests is not None
+        limits.append(self.config.limit_max_requests)
+
+    monkeypatch.setattr(uvicorn.Server, "serve", serve)
+    for _ in range(20):
+        config = uvicorn.Config(server.APP, limit_max_requests=max_requests)
+        await server.GracefulServer(config).serve()
+
+    jitter = max_requests * server.MAX_REQUESTS_JITTER
+    assert all(max_requests <= limit <= max_requests + jitter for limit in limits)
+    assert len(set(limits)) > 1
+
+
+@pytest.fixture
+def graceful_server(monkeypatch: pytest.MonkeyPatch) -> server.GracefulServer:
+    monkeypatch.setattr(lifecycle, "draining_since", None)
+    monkeypatch.setattr(lifecycle, "closed_at", None)
+    return server.GracefulServer(uvicorn.Config(server.APP))
+
+
+def test_first_signal_only_drains(graceful_server: server.GracefulServer) -> None:
+    graceful_server.handle_exit(signal.SIGTERM, None)
+
+    assert lifecycle.draining
+    assert not graceful_server.should_exit
+    assert not graceful_server.force_exit
+
+    graceful_server.handle_exit(signal.SIGTERM, None)
+
+    assert graceful_server.should_exit
+    assert graceful_server.force_exit
+
+
+def test_stops_accepting_at_once_without_drain_delay(
+    monkeypatch: pytest.MonkeyPatch, graceful_server: server.GracefulServer
+) -> None:
+    monkeypatch.setattr(settings, "server_drain_delay_seconds", 0)
+
+    graceful_server.handle_exit(signal.SIGTERM, None)
+
+    assert graceful_server.should_exit
+    assert not graceful_server.force_exit
+
+    graceful_server.handle_exit(signal.SIGTERM, None)
+
+    assert graceful_server.force_exit
+
+
+async def test_listener_closes_after_drain_delay(
+    monkeypatch: pytest.MonkeyPatch, graceful_server: server.GracefulServer
+) -> None:
+    monkeypatch.setattr(settings, "server_drain_delay_seconds", DRAIN_DELAY)
+    assert not await graceful_server.on_tick(1)
+
+    graceful_server.handle_exit(signal.SIGTERM, None)
+    assert not await graceful_server.on_tick(1)
+    assert lifecycle.closed_at is None
+
+    await asyncio.sleep(DRAIN_DELAY)
+    assert await graceful_server.on_tick(1)
+    assert lifecycle.closed_at is not None
+
+
+class LoadBalancer:
+    """Round-robin over backends passing their readiness check, like a
+    platform proxy. Requests refused at connect time were never delivered
+    and go to another backend; anything else is reported as is."""
+
+    def __init__(self, client: AsyncClient) -> None:
+        self.client = client
+        self.backends: dict[str, bool] = {}
+        self.drained: set[str] = set()
+        self.sent = itertools.count()
+        self.checked = asyncio.Event()
+
+    async def check(self) -> None:
+        while True:
+            for url in list(self.backends):
+                try:
+                    response = await self.client.get(f"{url}/health/ready")
+                except httpx.TransportError:
+                    self.backends[url] = False
+                    continue
+                self.backends[url] = response.status_code == status.HTTP_200_OK
+                if response.json()["draining"]:
+                    self.drained.add(url)
+            self.checked.set()
+            self.checked = asyncio.Event()
+            await asyncio.sleep(HEALTH_CHECK_INTERVAL)
+
+    async def get(self, path: str) -> httpx.Response:
+        while True:
+            ready = [url for url, is_ready in self.backends.items() if is_ready]
+            if not ready:
+                await self.checked.wait()
+                continue
+            url = ready[next(self.sent) % len(ready)]
+            with contextlib.suppress(httpx.ConnectError):
+                return await self.client.get(f"{url}{path}")
+
+
+@pytest.fixture
+async def processes() -> AsyncGenerator[list[asyncio.subprocess.Process]]:
+    processes: list[asyncio.subprocess.Process] = []
+    yield processes
+    for process in processes:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+
+async def start_backend(
+    balancer: LoadBalancer, processes: list[asyncio.subprocess.Process]
+) -> tuple[str, asyncio.subprocess.Process]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    env = {
+        **os.environ,
+        "HOST": "127.0.0.1",
+        "PORT": str(port),
+        "SERVER_WORKERS": "1",
+        "SERVER_DRAIN_DELAY_SECONDS": str(DRAIN_DELAY),
+        "POSTGRES_DB": f"{settings.postgres_db}_test",
+    }
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        "src.server",
+        cwd=ROOT,
+        env=env,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    processes.append(process)
+    url = f"http://127.0.0.1:{port}"
+    balancer.backends[url] = False
+    async with asyncio.timeout(STARTUP_TIMEOUT):
+        while not balancer.backends[url]:
+            await balancer.checked.wait()
+    return url, process
+
+
+async def wait_backend(process: asyncio.subprocess.Process) -> str:
+    async with asyncio.timeout(STARTUP_TIMEOUT):
+        _, stderr = await process.communicate()
+    assert process.returncode == 0
+    return stderr.decode()
+
+
+@pytest.fixture
+async def user_id(engine: AsyncEngine) -> AsyncGenerator[uuid.UUID]:
+    user_id = uuid.uuid4()
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User).values(
+                id=user_id,
+                google_id=str(user_id),
+                email=f"{user_id}@example.com",
+                given_name="Ada",
+                family_name="Lovelace",
+                picture_url="https://example.com/ada.png",
+            )
+        )
+    yield user_id
+    async with engine.begin() as conn:
+        await conn.execute(delete(User).where(User.id == user_id))
+
+
+async def test_rolling_restart_under_load(
+    user_id: uuid.UUID, processes: list[asyncio.subprocess.Process]
+) -> None:
+    client = AsyncClient(
+        cookies={AUTH_COOKIE_NAME: create_access_token(user_id)},
+        # One connection per request: a request is either refused before it
+        # is sent or gets a response, never silently retried
+        limits=httpx.Limits(max_keepalive_connections=0),
+    )
+    balancer = LoadBalancer(client)
+    checker = asyncio.create_task(balancer.check())
+    statuses: list[int] = []
+    stop = asyncio.Event()
+
+    async def load() -> None:
+        while not stop.is_set():
+            statuses.append((await balancer.get(ME_PATH)).status_code)
+
+    async with client:
+        old_url, old = await start_backend(balancer, processes)
+        workers = [asyncio.create_task(load()) for _ in range(LOAD_WORKERS)]
+        _, new = await start_backend(balancer, processes)
+
+        old.send_signal(signal.SIGTERM)
+        # Still served while the load balancer catches up
+        response = await client.get(f"{old_url}{ME_PATH}")
+        assert response.status_code == status.HTTP_200_OK
+        log = await wait_backend(old)
+        during_restart = len(statuses)
+        await asyncio.sleep(DRAIN_DELAY)
+
+        stop.set()
+        await asyncio.gather(*workers)
+        checker.cancel()
+        new.terminate()
+        new_log = await wait_backend(new)
+
+    assert old_url in balancer.drained
+    assert len(statuses) > during_restart > 0
+    assert set(statuses) == {status.HTTP_200_OK}
+    for step in (
+        "readiness off",
+        "load balancer drain took",
+        "in-flight requests took",
+        "auth events flush took",
+        "database pool took",
+        "completed in",
+    ):
+        assert f"Shutdown: {step}" in log
+    assert "Shutdown: completed in" in new_log
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from src.core.single_flight import SingleFlight
+
+
+async def test_concurrent_callers_share_one_task() -> None:
+    flights = SingleFlight()
+    started = []
+
+    async def work() -> str:
+        started.append("work")
+        await asyncio.sleep(0.01)
+        return "done"
+
+    results = await asyncio.gather(*(flights.join("key", work) for _ in range(3)))
+
+    assert results == ["done"] * 3
+    assert started == ["work"]
+    assert not flights.tasks
+
+    assert await flights.join("key", work) == "done"
+    assert started == ["work", "work"]
+
+
+async def test_cancelled_caller_does_not_cancel_the_others() -> None:
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def work() -> str:
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flights.join("key", work))
+    second = asyncio.create_task(flights.join("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "done"
+    assert first.cancelled()
+
+
+async def test_failure_reaches_every_caller() -> None:
+    flights = SingleFlight()
+
+    async def broken() -> None:
+        await asyncio.sleep(0)
+        raise RuntimeError("failed")
+
+    results = await asyncio.gather(
+        flights.join("key", broken),
+        flights.join("key", broken),
+        return_exceptions=True,
+    )
+
+    assert [type(result) for result in results] == [RuntimeError] * 2
+    assert not flights.tasks
+    with pytest.raises(RuntimeError):
+        await flights.join("key", broken)
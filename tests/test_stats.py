@@ -0,0 +1,228 @@
+import uuid
+from collections.abc import AsyncGenerator
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import delete, event, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import Insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from src.auth.models import AuthEventKind, auth_events
+from src.auth.schemas import GoogleUser
+from src.stats import rollups
+from src.stats.cache import StatsCache
+from src.stats.models import DailyUserStats
+from src.users.activity import ActivityTracker
+from src.users.models import User
+from src.users.repo import UserRepo
+
+# Far from today, so rows written by other tests don't interfere
+DAY = date(2001, 2, 3)
+NOON = datetime(DAY.year, DAY.month, DAY.day, 12, tzinfo=UTC)
+SIGNUPS = 4
+ACTIVE_USERS = 7
+
+
+async def read_stats(
+    conn: AsyncSession | AsyncConnection, day: date
+) -> tuple[int, int]:
+    result = await conn.execute(
+        select(DailyUserStats.signups, DailyUserStats.active_users).where(
+            DailyUserStats.day == day
+        )
+    )
+    row = result.one_or_none()
+    return (row.signups, row.active_users) if row else (0, 0)
+
+
+def add_today_signups() -> Insert:
+    today = literal(datetime.now(UTC).date())
+    return rollups.add_counts("signups", select(today, literal(SIGNUPS)))
+
+
+@pytest.fixture
+async def user_ids(engine: AsyncEngine) -> AsyncGenerator[list[uuid.UUID]]:
+    ids = [uuid.uuid4() for _ in range(3)]
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User),
+            [
+                {
+                    "id": id,
+                    "google_id": str(id),
+                    "email": f"{id}@example.com",
+                    "created_at": NOON,
+                }
+                for id in ids
+            ],
+        )
+    yield ids
+    async with engine.begin() as conn:
+        await conn.execute(delete(User).where(User.id.in_(ids)))
+        await conn.execute(auth_events.delete().where(auth_events.c.user_id.in_(ids)))
+        await conn.execute(
+            delete(DailyUserStats).where(DailyUserStats.day >= DAY - timedelta(1))
+        )
+
+
+async def test_signups_are_counted_once(
+    session: AsyncSession, google_user: GoogleUser
+) -> None:
+    user_repo = UserRepo(session)
+    today = datetime.now(UTC).date()
+    signups, active_users = await read_stats(session, today)
+
+    await user_repo.update_or_create_google_user(google_user)
+    await user_repo.update_or_create_google_user(google_user)
+
+    assert await read_stats(session, today) == (signups + 1, active_users)
+
+
+async def test_first_activity_of_each_day_is_counted(
+    engine: AsyncEngine, user_ids: list[uuid.UUID]
+) -> None:
+    tracker = ActivityTracker(engine, interval=60, flush_interval=1, max_pending=10)
+
+    tracker.pending = {user_ids[0]: NOON, user_ids[1]: NOON}
+    await tracker.flush()
+    tracker.pending = {
+        user_ids[0]: NOON + timedelta(hours=1),
+        user_ids[1]: NOON + timedelta(days=1),
+        user_ids[2]: NOON - timedelta(days=1),
+    }
+    await tracker.flush()
+
+    async with engine.connect() as conn:
+        assert await read_stats(conn, DAY - timedelta(1)) == (0, 1)
+        assert await read_stats(conn, DAY) == (0, 2)
+        assert await read_stats(conn, DAY + timedelta(1)) == (0, 1)
+
+
+async def test_activity_touches_the_rollup_row_last(
+    engine: AsyncEngine, user_ids: list[uuid.UUID]
+) -> None:
+    tracker = ActivityTracker(engine, interval=60, flush_interval=1, max_pending=10)
+    statements: list[str] = []
+
+    def executed(*args: Any) -> None:
+        statements.append(args[2])
+
+    event.listen(engine.sync_engine, "before_cursor_execute", executed)
+    tracker.pending = {user_ids[0]: NOON}
+    try:
+        await tracker.flush()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", executed)
+
+    # Signups on the same day wait on this row only until the commit
+    rollup = [s for s in statements if "daily_user_stats" in s]
+    assert rollup == statements[-1:]
+
+
+async def test_backfill(engine: AsyncEngine, user_ids: list[uuid.UUID]) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(
+            update(User)
+            .where(User.id == user_ids[0])
+            .values(last_seen_at=NOON + timedelta(days=1))
+        )
+        await conn.execute(
+            insert(auth_events),
+            [
+                {
+                    "occurred_at": NOON,
+                    "kind": AuthEventKind.login_succeeded,
+                    "user_id": user_ids[0],
+                },
+                {
+                    "occurred_at": NOON,
+                    "kind": AuthEventKind.logout,
+                    "user_id": user_ids[1],
+                },
+            ],
+        )
+
+    await rollups.backfill(engine)
+    await rollups.backfill(engine)
+
+    async with engine.connect() as conn:
+        assert await read_stats(conn, DAY) == (len(user_ids), 1)
+        assert await read_stats(conn, DAY + timedelta(1)) == (0, 1)
+
+
+async def test_backfill_never_lowers_counts(
+    engine: AsyncEngine, user_ids: list[uuid.UUID]
+) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(DailyUserStats).values(day=DAY, active_users=ACTIVE_USERS)
+        )
+
+    await rollups.backfill(engine)
+
+    async with engine.connect() as conn:
+        assert await read_stats(conn, DAY) == (len(user_ids), ACTIVE_USERS)
+
+
+async def test_admin_reads_daily_stats(
+    admin_client: AsyncClient, session: AsyncSession
+) -> None:
+    today = datetime.now(UTC).date()
+    await session.execute(
+        insert(DailyUserStats).values(
+            day=today - timedelta(days=1),
+            signups=SIGNUPS,
+            active_users=ACTIVE_USERS,
+        )
+    )
+
+    response = await admin_client.get("/admin/stats/users", params={"days": 3})
+
+    assert response.status_code == status.HTTP_200_OK
+    stats = response.json()
+    assert stats["since"] == str(today - timedelta(days=2))
+    assert stats["until"] == str(today)
+    assert [day["day"] for day in stats["days"]] == [
+        str(today - timedelta(days=offset)) for offset in (2, 1, 0)
+    ]
+    assert stats["days"][0] == {
+        "day": str(today - timedelta(days=2)),
+        "signups": 0,
+        "active_users": 0,
+    }
+    assert stats["days"][1]["active_users"] == ACTIVE_USERS
+    assert stats["signups"] == sum(day["signups"] for day in stats["days"])
+
+
+async def test_stats_are_cached(
+    admin_client: AsyncClient, session: AsyncSession
+) -> None:
+    first = await admin_client.get("/admin/stats/users")
+    await session.execute(add_today_signups())
+    second = await admin_client.get("/admin/stats/users")
+
+    assert second.json() == first.json()
+
+
+async def test_expired_stats_are_reloaded(
+    admin_client: AsyncClient, session: AsyncSession, stats_cache: StatsCache
+) -> None:
+    stats_cache.ttl = 0
+    first = await admin_client.get("/admin/stats/users")
+    await session.execute(add_today_signups())
+    second = await admin_client.get("/admin/stats/users")
+
+    assert second.json()["signups"] == first.json()["signups"] + SIGNUPS
+
+
+async def test_stats_need_an_admin(auth_client: AsyncClient) -> None:
+    response = await auth_client.get("/admin/stats/users")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+async def test_stats_days_are_bounded(admin_client: AsyncClient) -> None:
+    response = await admin_client.get("/admin/stats/users", params={"days": 367})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT